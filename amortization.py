@@ -0,0 +1,102 @@
+import numpy as np
+from typing import NamedTuple
+
+
+class Schedule(NamedTuple):
+    periods: np.ndarray
+    payment: np.ndarray
+    interest: np.ndarray
+    principal: np.ndarray
+    balance: np.ndarray
+
+
+def _column(value):
+    return np.asarray(value, dtype=float)[..., np.newaxis]
+
+
+def whole_years(term_years):
+    """Loan terms rounded to whole years (halves up), so every engine makes the same number of payments."""
+    return np.floor(np.asarray(term_years, dtype=float) + 0.5)
+
+
+def _period_rate(annual_rate, periods_per_year):
+    # Constant rates become (N, 1) columns; (N, periods) floating-rate paths are kept as they are
+    rate = np.asarray(annual_rate, dtype=float)
+    return (rate if rate.ndim >= 2 else rate[..., np.newaxis]) / 100 / periods_per_year
+
+
+def _level_factor(rate, remaining):
+    # Share of the opening balance still owed after a level payment with `remaining` payments to go
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        annuity = np.where(rate == 0, 1 / remaining, rate / (1 - (1 + rate) ** -remaining))
+    return 1 + rate - annuity
+
+
+def amortize(principal, annual_rate, term_years, periods=None, periods_per_year=1, grace_periods=0,
+             balloon_pct=0.0, refinance_period=0, refinance_rate=np.nan, refinance_term=np.nan):
+    """Interest, principal and closing balance of every loan in every period.
+
+    Rates and the balloon are in percent. During the first `grace_periods`
+    only interest is paid; the loan then amortizes with level payments down to
+    a final balloon of balloon_pct of the principal, due with the last payment
+    (an amortizing tranche plus an interest-only bullet, which gives exactly
+    the level annuity-with-balloon payment). With `refinance_period` > 0 the
+    balance outstanding after that period is re-amortized at `refinance_rate`
+    over `refinance_term` years (NaN keeps the original rate or remaining term).
+
+    `annual_rate` may also be a floating rate, a (N, periods) or (1, periods)
+    path with one annual rate per period (the last rate is held beyond the
+    path); each payment is then re-set to amortize the outstanding balance
+    at that period's rate over the remaining term.
+
+    Every schedule is a cumulative product of per-period balance factors, so
+    arrays of N loans give (N, periods) schedules without looping over time.
+    `periods` defaults to the longest loan; later periods are truncated.
+    """
+    p = _column(principal)
+    rate = _period_rate(annual_rate, periods_per_year)
+    n = np.round(_column(term_years) * periods_per_year)
+    grace = _column(grace_periods)
+    balloon = p * _column(balloon_pct) / 100
+    f = _column(refinance_period)
+    refinanced = f > 0
+
+    new_n = np.where(np.isnan(_column(refinance_term)), n - f, np.round(_column(refinance_term) * periods_per_year))
+    if periods is None:
+        periods = int(np.max(np.where(refinanced, f + new_n, n)))
+    t = np.arange(1, periods + 1)
+    if rate.shape[-1] > 1:
+        rate = rate[..., np.minimum(t, rate.shape[-1]) - 1]
+    new_rate = np.where(np.isnan(_column(refinance_rate)), rate, _column(refinance_rate) / 100 / periods_per_year)
+
+    # Original loan: interest-only grace, then level payments on the amortizing tranche (the
+    # last payment clears it exactly)
+    factor = np.where(t <= grace, 1.0, np.where(t < n, _level_factor(rate, n - t + 1), 0.0))
+    balance = (p - balloon) * np.cumprod(factor, axis=-1) + np.where(t < n, balloon, 0.0)
+    balance = np.broadcast_to(balance, np.broadcast_shapes(balance.shape, f.shape, new_rate.shape))
+
+    # Refinancing restarts level amortization of the balance owed at the end of period f
+    if np.any(refinanced):
+        index = np.broadcast_to(np.clip(f - 1, 0, periods - 1).astype(int), balance.shape[:-1] + (1,))
+        owed = np.take_along_axis(balance, index, axis=-1)
+        since = t - f
+        new_factor = np.where(since <= 0, 1.0, np.where(since < new_n, _level_factor(new_rate, new_n - since + 1), 0.0))
+        after = refinanced & (since > 0)
+        balance = np.where(after, owed * np.cumprod(new_factor, axis=-1), balance)
+        rate = np.where(after, new_rate, rate)
+
+    opening = np.concatenate([np.broadcast_to(p, balance.shape[:-1] + (1,)), balance[..., :-1]], axis=-1)
+    interest = opening * rate
+    principal_paid = opening - balance
+    return Schedule(t, interest + principal_paid, interest, principal_paid, balance)
+
+
+def annual_schedule(schedule, periods_per_year):
+    """Sum a sub-annual schedule into years, keeping each year's closing balance."""
+    years = len(schedule.periods) // periods_per_year
+
+    def total(values):
+        return values.reshape(values.shape[:-1] + (years, periods_per_year)).sum(axis=-1)
+
+    return Schedule(np.arange(1, years + 1), total(schedule.payment), total(schedule.interest),
+                    total(schedule.principal), schedule.balance[..., periods_per_year - 1::periods_per_year])
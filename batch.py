@@ -0,0 +1,112 @@
+"""Headless batch runner: evaluate a CSV/Parquet file of station scenarios.
+
+    python batch.py scenarios.csv results.parquet --years 10 --chunk-size 100000
+
+Each row is one station configuration using the column names of
+scenarios.SCENARIO_DEFAULTS; missing columns take the sidebar defaults.
+Rows are read, evaluated and written in chunks, each sharded over worker
+processes (see parallel.py).
+"""
+import argparse
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+from parallel import ParallelEvaluator
+from scenarios import compare_lease_buy, npv_scenarios
+
+
+def _is_parquet(path):
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+def read_chunks(path, chunk_size):
+    """Yield DataFrames of at most `chunk_size` rows from a CSV or Parquet file."""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Append DataFrame chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._header = True
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def run_batch(input_path, output_path, years=10, chunk_size=100_000, workers=None, shard_size=25_000,
+              npv_only=False, lease_vs_buy=False):
+    """Evaluate every row of `input_path` and write results to `output_path`, keeping row order.
+
+    Each chunk is sharded across the worker pool through shared memory, so
+    memory stays bounded by the chunk size for arbitrarily long input files.
+    With `npv_only`, only NPV is computed, in closed form and in-process;
+    with `lease_vs_buy`, each row is compared bought and leased (see
+    scenarios.compare_lease_buy), in-process. Returns the number of rows written.
+    """
+    writer = ChunkWriter(output_path)
+    rows = 0
+    try:
+        with contextlib.ExitStack() as stack:
+            if not (npv_only or lease_vs_buy):
+                evaluator = stack.enter_context(
+                    ParallelEvaluator(years, capacity=chunk_size, workers=workers, shard_size=shard_size))
+            for chunk in read_chunks(input_path, chunk_size):
+                if npv_only:
+                    metrics = pd.DataFrame({"npv": npv_scenarios(chunk, years)})
+                elif lease_vs_buy:
+                    metrics = compare_lease_buy(chunk, years)
+                else:
+                    metrics = evaluator.evaluate(chunk)
+                metrics.index = chunk.index
+                writer.write(pd.concat([chunk, metrics], axis=1))
+                rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate EV charging station scenarios without the Streamlit app.")
+    parser.add_argument("input", help="scenario file (.csv or .parquet), one row per station configuration")
+    parser.add_argument("output", help="results file (.csv or .parquet)")
+    parser.add_argument("--years", type=int, default=10, help="projection duration in years (default: 10)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per chunk (default: 100000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=25_000, help="rows per worker task (default: 25000)")
+    parser.add_argument("--npv-only", action="store_true", help="compute only NPV, in closed form (fast screening)")
+    parser.add_argument("--lease-vs-buy", action="store_true",
+                        help="compare buying and leasing each row (NPVs and crossover discount rate)")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.input, args.output, args.years, args.chunk_size, args.workers, args.shard_size,
+                     args.npv_only, args.lease_vs_buy)
+    print(f"Wrote {rows:,} scenario results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
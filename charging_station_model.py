@@ -1,31 +1,89 @@
 import streamlit as st
 import numpy as np
-import numpy_financial as npf
 import pandas as pd
 
+import matplotlib.pyplot as plt
+
+from model import run_model
+from dispatch import DISPATCH_MODES, dispatch_cost_per_kwh, grid_availability, run_dispatch
+from energy import annual_energy_summary, charging_load, energy_balance
+from fx import fx_paths, fx_summary, station_components
+from locations import get_location, hourly_profiles, location_names, location_table
+from montecarlo import percentile_table, simulate
+from portfolio import evaluate_portfolio, site_frame
+from queueing import capacity_table, erlang_capture_rate
+from rate_paths import mean_reverting_paths, path_matrix
+from scenarios import compare_lease_buy, evaluate_scenarios
+from sensitivity import sensitivity_grid, tornado
+from tariffs import Tariff, effective_price, hour_of_week_prices, hourly_energy_sold
+from utilization import simulate_utilization
+
+# Model inputs that can be varied in sensitivity analysis, with their sidebar bounds
+SENSITIVITY_INPUTS = {
+    "sessions_per_day": ("Charging Sessions per Day", 10, 200),
+    "price_per_kwh": ("Price per kWh (₦)", 100, 1000),
+    "avg_kwh_per_session": ("Avg kWh per Session", 5, 50),
+    "capex": ("Initial Setup Cost (₦)", 1_000_000, 50_000_000),
+    "opex_monthly": ("Monthly Operating Expense (₦)", 50_000, 5_000_000),
+    "opex_inflation": ("Annual Opex Inflation (%)", 0.0, 20.0),
+    "revenue_growth": ("Annual Revenue Growth (%)", 0.0, 20.0),
+    "loan_pct": ("Loan % of CapEx", 0, 100),
+    "interest_rate": ("Annual Interest Rate (%)", 0.0, 20.0),
+    "discount_rate": ("Discount Rate (%)", 0.0, 20.0),
+}
+
 # --- Title and Description ---
 st.title("⚡ EV Charging Station Financial Model - Lagos (Dynamic)")
 st.markdown("Model your EV station's cost, revenue, and return over time with dynamic projections, including revenue growth and cost inflation.")
 
 # --- Sidebar Inputs ---
 st.sidebar.header("📍 Station Configuration")
-location = st.sidebar.selectbox("Station Location", ["Victoria Island", "Lekki", "Ikeja", "Agege"])
+location = st.sidebar.selectbox("Station Location", location_names())
+site = get_location(location)
 charger_type = st.sidebar.selectbox("Charger Type", ["AC (Slow)", "DC (Fast)"])
 charging_time = st.sidebar.slider("Avg Charging Duration (mins)", 15, 120, 60)
-sessions_per_day = st.sidebar.slider("Charging Sessions per Day", 10, 200, 50)
+sessions_per_day = st.sidebar.slider("Charging Sessions per Day", 10, 200, int(site.sessions_per_day))
+num_chargers = st.sidebar.slider("Number of Chargers", 1, 20, 4)
+limit_by_capacity = st.sidebar.checkbox("Limit Sessions by Charger Capacity", value=True)
 
 st.sidebar.header("💸 Cost Parameters")
 capex = st.sidebar.number_input("Initial Setup Cost (₦)", min_value=1_000_000, value=15_000_000, step=1_000_000)
 opex_monthly = st.sidebar.number_input("Monthly Operating Expense (₦)", min_value=50_000, value=500_000, step=50_000)
+land_cost_monthly = st.sidebar.number_input("Land Lease (₦/month)", min_value=0, value=int(site.land_cost_monthly), step=10_000)
 
 st.sidebar.header("⚡ Energy and Revenue")
 if charger_type == "AC (Slow)":
     default_price = 300
 else:
     default_price = 500
-price_per_kwh = st.sidebar.number_input("Price per kWh (₦)", min_value=100, value=default_price, step=10)
+price_per_kwh = st.sidebar.number_input("Price per kWh (₦)", min_value=100, max_value=int(site.tariff_cap),
+                                        value=min(default_price, int(site.tariff_cap)), step=10,
+                                        help=f"Capped at ₦{site.tariff_cap:,.0f}/kWh in {location}")
 avg_kwh_per_session = st.sidebar.slider("Avg kWh per Session", 5, 50, 20)
 solar_percent = st.sidebar.slider("Solar Share (%)", 0, 100, 40)
+grid_price = st.sidebar.number_input("Grid Electricity Tariff (₦/kWh)", min_value=0, value=225, step=5)
+solar_cost = st.sidebar.number_input("Solar O&M Cost (₦/kWh)", min_value=0, value=20, step=5)
+
+st.sidebar.header("🕒 Tariff Design")
+tariff_mode = st.sidebar.selectbox("Tariff", ["Flat", "Time-of-Use"])
+if tariff_mode == "Time-of-Use":
+    peak_hours = st.sidebar.slider("Peak Hours", 0, 24, (17, 21))
+    peak_premium = st.sidebar.slider("Peak Premium (%)", 0, 100, 20)
+    off_peak_start = st.sidebar.slider("Off-Peak Starts (hour)", 0, 23, 22)
+    off_peak_end = st.sidebar.slider("Off-Peak Ends (hour)", 0, 23, 6)
+    off_peak_discount = st.sidebar.slider("Off-Peak Discount (%)", 0, 100, 15)
+    weekend_discount = st.sidebar.slider("Weekend Discount (%)", 0, 100, 10)
+    member_discount = st.sidebar.slider("Membership Discount (%)", 0, 100, 10)
+    member_share = st.sidebar.slider("Sessions by Members (%)", 0, 100, 30)
+
+st.sidebar.header("🔋 Battery & Backup")
+grid_hours = st.sidebar.slider("Grid Supply (hours/day)", 0, 24, int(site.grid_hours))
+diesel_cost = st.sidebar.number_input("Diesel Generation Cost (₦/kWh)", min_value=0, value=450, step=10)
+battery_kwh = st.sidebar.number_input("Battery Capacity (kWh)", min_value=0, value=0, step=50)
+battery_kw = st.sidebar.number_input("Battery Power (kW)", min_value=0, value=50, step=10)
+dispatch_mode = st.sidebar.selectbox("Battery Dispatch", list(DISPATCH_MODES),
+                                     help="Greedy is instant; each LP takes a few seconds. "
+                                          "48h foresight models an operator who plans two days ahead.")
 
 opex_inflation = st.sidebar.slider("Annual Opex Inflation (%)", 0.0, 20.0, 5.0)
 revenue_growth = st.sidebar.slider("Annual Revenue Growth (%)", 0.0, 20.0, 3.0)
@@ -34,91 +92,396 @@ st.sidebar.header("🏦 Financing")
 loan_pct = st.sidebar.slider("Loan % of CapEx", 0, 100, 50)
 loan_term = st.sidebar.slider("Loan Tenure (years)", 1, 10, 5)
 interest_rate = st.sidebar.slider("Annual Interest Rate (%)", 0.0, 20.0, 10.0)
+grace_years = st.sidebar.slider("Grace Period (years, interest only)", 0, loan_term - 1, 0) if loan_term > 1 else 0
+balloon_pct = st.sidebar.slider("Balloon Payment (% of loan)", 0, 100, 0)
 lease_option = st.sidebar.selectbox("Asset Ownership", ["Outright Purchase", "Lease"])
+compare_ownership = st.sidebar.checkbox("Compare Lease vs Buy", value=False)
+lease_rate, lease_term, lease_escalation, lease_buyout_pct = 15.0, 10, 0.0, 0
+if lease_option == "Lease" or compare_ownership:
+    lease_rate = st.sidebar.slider("Lease Rent (% of CapEx per year)", 1.0, 50.0, 15.0)
+    lease_term = st.sidebar.slider("Lease Term (years)", 1, 15, 10)
+    lease_escalation = st.sidebar.slider("Rent Escalation (% per year)", 0.0, 20.0, 0.0)
+    lease_buyout_pct = st.sidebar.slider("Buyout at End of Term (% of CapEx)", 0, 100, 0)
+
+st.sidebar.header("💱 Currency")
+show_fx = st.sidebar.checkbox("Show USD Investor View", value=False)
+if show_fx:
+    fx_spot = st.sidebar.number_input("Exchange Rate Today (₦ per $)", min_value=1, value=1500, step=50)
+    usd_capex_share = st.sidebar.slider("Equipment Priced in USD (%)", 0, 100, 70)
+    usd_loan = st.sidebar.checkbox("Loan Denominated in USD", value=False)
+    fx_mode = {"Steady Devaluation": "deterministic", "Random Walk (GBM)": "gbm", "Regime Switching": "regime"}[
+        st.sidebar.selectbox("FX Path Model", ["Steady Devaluation", "Random Walk (GBM)", "Regime Switching"])]
+    fx_devaluation = st.sidebar.slider("Expected Naira Devaluation (% per year)", 0.0, 50.0, 10.0)
+    fx_volatility = st.sidebar.slider("FX Volatility (% per year)", 0.0, 50.0, 15.0) if fx_mode != "deterministic" else 0.0
+    fx_path_count = st.sidebar.select_slider("FX Paths", [1_000, 10_000, 100_000], value=10_000) if fx_mode != "deterministic" else 1
+
+st.sidebar.header("🧾 Tax")
+allowance_method = st.sidebar.selectbox("Capital Allowances", ["Straight Line", "Declining Balance"])
+allowance_life = st.sidebar.slider("Allowance Period (years)", 1, 10, 5)
+declining_rate = st.sidebar.slider("Declining-Balance Rate (%)", 5, 50, 25) if allowance_method == "Declining Balance" else 0
 
 st.sidebar.header("📊 Projection")
 years = st.sidebar.slider("Projection Duration (years)", 1, 15, 10)
 discount_rate = st.sidebar.slider("Discount Rate (%)", 0.0, 20.0, 10.0)
+resolution_label = st.sidebar.selectbox("Time Resolution", ["Annual", "Monthly", "Daily"])
+periods_per_year = {"Annual": 1, "Monthly": 12, "Daily": 365}[resolution_label]
+model_lifecycle = st.sidebar.checkbox("Model Equipment Replacement and Salvage", value=False)
+
+st.sidebar.header("📈 Rate Paths")
+rate_path_mode = st.sidebar.selectbox("Growth, Inflation and Interest Rates", ["Constant", "Year-by-Year", "Mean-Reverting"])
+# Rate inputs that can follow a path, with their constant sidebar values
+path_rates = {
+    "revenue_growth": ("Revenue Growth (%)", revenue_growth),
+    "opex_inflation": ("Opex Inflation (%)", opex_inflation),
+    "interest_rate": ("Interest Rate (%)", interest_rate),
+}
+rate_paths = None
+if rate_path_mode == "Year-by-Year":
+    yearly_rates = st.sidebar.data_editor(pd.DataFrame(
+        {label: [float(value)] * years for label, value in path_rates.values()},
+        index=pd.Index(np.arange(1, years + 1), name="Year")))
+    rate_paths = {name: tuple(yearly_rates[label].fillna(value)) for name, (label, value) in path_rates.items()}
+elif rate_path_mode == "Mean-Reverting":
+    rate_persistence = st.sidebar.slider("Persistence (share of a shock left next year)", 0.0, 0.95, 0.6)
+    rate_volatility = st.sidebar.slider("Rate Volatility (pp per year)", 0.0, 10.0, 2.0)
+    rate_path_count = st.sidebar.select_slider("Rate Paths", [1_000, 10_000, 100_000], value=10_000)
+# The same paths as (1, years) matrices for the batched risk, sensitivity and portfolio analyses
+path_arrays = {name: path_matrix(values, years) for name, values in (rate_paths or {}).items()}
+
+st.sidebar.header("🎲 Risk Analysis")
+run_simulation = st.sidebar.checkbox("Run Monte Carlo Simulation", value=False)
+if run_simulation:
+    sim_paths = st.sidebar.select_slider("Simulation Paths", [10_000, 100_000, 1_000_000], value=100_000)
+    sessions_sd = st.sidebar.slider("Sessions/Day Uncertainty (± % std)", 0, 50, 20)
+    price_spread = st.sidebar.slider("Tariff Range (± %)", 0, 50, 15)
+    opex_inflation_sd = st.sidebar.slider("Opex Inflation Std Dev (pp)", 0.0, 10.0, 2.0)
+    revenue_growth_sd = st.sidebar.slider("Revenue Growth Std Dev (pp)", 0.0, 10.0, 2.0)
+    interest_rate_sd = st.sidebar.slider("Interest Rate Std Dev (pp)", 0.0, 10.0, 2.0)
+
+st.sidebar.header("🔍 Sensitivity")
+show_heatmap = st.sidebar.checkbox("Show Two-Way Sensitivity Heatmap", value=False)
+show_tornado = st.sidebar.checkbox("Show Tornado Chart", value=False)
+show_capacity = st.sidebar.checkbox("Show Charger Capacity Planning", value=False)
+
+st.sidebar.header("🏢 Portfolio")
+show_portfolio = st.sidebar.checkbox("Model a Portfolio of Stations", value=False)
 
 # --- Calculations ---
-sessions_per_year = sessions_per_day * 365
-revenue_per_year = sessions_per_year * avg_kwh_per_session * price_per_kwh
-
-loan_amount = capex * loan_pct / 100
-equity_amount = capex - loan_amount
-annual_loan_payment = npf.pmt(interest_rate / 100, loan_term, -loan_amount)
-opex_yearly = opex_monthly * 12
-lease_payment = capex * 0.15 if lease_option == "Lease" else 0
-
-# Initialize lists
-cash_flows = [-capex]
-cumulative_cf = [-capex]
-chart_years = []
-chart_revenue = []
-chart_costs = []
-chart_net = []
-
-annual_revenue = revenue_per_year
-annual_opex = opex_yearly
-
-for year in range(1, years + 1):
-    # Apply growth and inflation
-    annual_revenue *= (1 + revenue_growth / 100)
-    annual_opex *= (1 + opex_inflation / 100)
-    
-    # Energy cost (simple estimate, could expand by energy mix)
-    energy_cost = annual_revenue * 0.3  # assume 30% of revenue goes to energy cost
-
-    # Loan payment drops off after loan term
-    annual_costs = annual_opex + energy_cost + (annual_loan_payment if year <= loan_term else 0) + lease_payment
-
-    net_cash = annual_revenue - annual_costs
-    cash_flows.append(net_cash)
-
-    chart_years.append(year)
-    chart_revenue.append(annual_revenue)
-    chart_costs.append(annual_costs)
-    chart_net.append(net_cash)
-
-    cumulative_cf.append(cumulative_cf[-1] + net_cash)
-
-# Financial Metrics
-npv = npf.npv(discount_rate / 100, cash_flows)
-irr = npf.irr(cash_flows)
-pi = (npv + capex) / capex
-pbp = next((i for i, x in enumerate(cumulative_cf) if x > 0), "Beyond projection")
-breakeven_price = (annual_opex + lease_payment + (annual_loan_payment if loan_term > 0 else 0)) / (sessions_per_year * avg_kwh_per_session)
+# The financial core is a pure function of the inputs; cached results are reused
+# when a previously seen configuration comes back (least recently used evicted first)
+cached_run_model = st.cache_data(max_entries=256, ttl="1h", show_spinner=False)(run_model)
+cached_simulate = st.cache_data(max_entries=16, ttl="1h")(simulate)
+cached_sensitivity_grid = st.cache_data(max_entries=32, ttl="1h", show_spinner=False)(sensitivity_grid)
+cached_tornado = st.cache_data(max_entries=64, ttl="1h", show_spinner=False)(tornado)
+
+# Hourly charger simulation; demand is assumed to grow with revenue, following its path if it has one
+demand_growth = path_arrays.get("revenue_growth", revenue_growth)
+utilization = st.cache_data(max_entries=64, ttl="1h", show_spinner=False)(simulate_utilization)(
+    sessions_per_day, charging_time, num_chargers, years, demand_growth, site.hourly_profile, seed=0)
+if np.ndim(demand_growth) == 2:
+    # Drop the leading axis the (1, years) growth path adds
+    utilization = type(utilization)(*(values[0] for values in utilization))
+capture_rate = tuple(utilization.capture_rate) if limit_by_capacity else None
+
+# Hourly solar, battery, grid and diesel supply of the year-1 charging load
+load = charging_load(utilization.hourly_served[0], avg_kwh_per_session, charging_time)
+balance = energy_balance(load, solar_percent)
+grid_available = grid_availability(grid_hours, seed=0)
+supply = st.cache_data(max_entries=32, ttl="1h", show_spinner=False)(run_dispatch)(
+    load, balance.pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw,
+    **DISPATCH_MODES[dispatch_mode])
+unit_energy_cost = float(dispatch_cost_per_kwh(supply, load, balance.pv_output, grid_price, diesel_cost, solar_cost))
+
+# Under time-of-use the model runs on the average price billed over the year-1 session profile
+if tariff_mode == "Time-of-Use":
+    tariff = Tariff(price_per_kwh, peak_hours, peak_premium, (off_peak_start, off_peak_end), off_peak_discount,
+                    weekend_discount, member_discount, member_share, site.tariff_cap)
+    billed_price = float(effective_price([tariff], hourly_energy_sold(utilization.hourly_served[0], avg_kwh_per_session))[0])
+    if np.isnan(billed_price):
+        billed_price = float(hour_of_week_prices([tariff]).mean())
+else:
+    billed_price = price_per_kwh
+
+# Model inputs as a scenario row, shared by the risk and sensitivity analyses
+scenario = {
+    "sessions_per_day": sessions_per_day,
+    "avg_kwh_per_session": avg_kwh_per_session,
+    "price_per_kwh": billed_price,
+    "capex": capex,
+    "opex_monthly": opex_monthly + land_cost_monthly,
+    "opex_inflation": opex_inflation,
+    "revenue_growth": revenue_growth,
+    "loan_pct": loan_pct,
+    "loan_term": loan_term,
+    "interest_rate": interest_rate,
+    "lease": lease_option == "Lease",
+    "discount_rate": discount_rate,
+    "energy_cost_per_kwh": unit_energy_cost,
+    "grace_years": grace_years,
+    "balloon_pct": balloon_pct,
+    "allowance_life": allowance_life,
+    "declining_rate": declining_rate,
+    "lease_rate": lease_rate,
+    "lease_term": lease_term,
+    "lease_escalation": lease_escalation,
+    "lease_buyout_pct": lease_buyout_pct,
+    "lifecycle": model_lifecycle,
+}
+
+results = cached_run_model(sessions_per_day, avg_kwh_per_session, billed_price, capex, opex_monthly + land_cost_monthly,
+                           opex_inflation, revenue_growth, loan_pct, loan_term, interest_rate,
+                           lease_option == "Lease", years, discount_rate, periods_per_year, capture_rate,
+                           unit_energy_cost, grace_years, balloon_pct, allowance_life, declining_rate,
+                           lease_rate, lease_term, lease_escalation, lease_buyout_pct, model_lifecycle, rate_paths)
+npv, irr, pi = results.npv, results.irr, results.profitability_index
+pbp = int(results.payback) if not np.isnan(results.payback) else "Beyond projection"
+breakeven_price = results.breakeven_price
 
 # --- Output Section ---
 st.subheader("💰 Financial Summary")
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("NPV (₦)", f"{npv:,.0f}")
-col2.metric("IRR (%)", f"{irr * 100:.2f}" if irr else "N/A")
+col2.metric("IRR (%)", f"{irr * 100:.2f}" if not np.isnan(irr) else "N/A")
 col3.metric("Payback Period", f"{pbp} years" if isinstance(pbp, int) else "Not achieved")
-col4.metric("Profitability Index", f"{pi:.2f}")
+col4.metric("Profitability Index", f"{pi:.2f}" if not np.isnan(pi) else "N/A")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("After-Tax NPV (₦)", f"{results.after_tax_npv:,.0f}")
+col2.metric("After-Tax IRR (%)", f"{results.after_tax_irr * 100:.2f}" if not np.isnan(results.after_tax_irr) else "N/A")
 
 st.subheader("🔑 Breakeven Price")
-st.write(f"Minimum price per kWh to cover costs: ₦{breakeven_price:,.2f}")
+if np.isnan(breakeven_price):
+    st.write("No price per kWh reaches NPV = 0 over the projection.")
+else:
+    st.write(f"Minimum price per kWh for NPV = 0 over the projection: ₦{breakeven_price:,.2f}")
+    if tariff_mode == "Time-of-Use":
+        st.caption(f"Average billed price; the current time-of-use design bills ₦{billed_price:,.2f}/kWh on average.")
+
+st.subheader("🔌 Charger Utilization (Year 1)")
+col1, col2, col3 = st.columns(3)
+col1.metric("Utilization", f"{utilization.utilization[0]:.1%}")
+col2.metric("Served Sessions per Day", f"{utilization.served[0] / 365:,.1f}")
+col3.metric("Lost Demand", f"{utilization.lost[0] / max(utilization.demand[0], 1):.1%}")
+st.caption("Each session holds a charger for the full charging duration; drivers who find every charger busy leave without charging.")
+
+st.subheader("☀️ Energy Mix (Year 1)")
+energy = annual_energy_summary(balance)
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("PV Array", f"{float(balance.pv_kwp):,.0f} kWp")
+col2.metric("Solar Used", f"{(balance.pv_output - supply.curtailed).sum() / max(energy['Charging Load (kWh)'], 1):.1%}")
+col3.metric("Grid Import", f"{supply.grid_import.sum():,.0f} kWh")
+col4.metric("Diesel", f"{supply.diesel.sum():,.0f} kWh")
+col5.metric("Energy Cost", f"₦{unit_energy_cost:,.1f}/kWh")
+
+if tariff_mode == "Time-of-Use":
+    st.subheader("🕒 Time-of-Use Tariff")
+    week_prices = hour_of_week_prices([tariff])[0]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Average Billed Price", f"₦{billed_price:,.1f}/kWh")
+    col2.metric("Peak Price", f"₦{week_prices.max():,.1f}/kWh")
+    col3.metric("Lowest Price", f"₦{week_prices.min():,.1f}/kWh")
+    st.line_chart(pd.DataFrame({"Price (₦/kWh)": week_prices}, index=pd.Index(np.arange(168), name="Hour of Week")))
+    if price_per_kwh * (1 + peak_premium / 100) > site.tariff_cap:
+        st.caption(f"Prices are capped at ₦{site.tariff_cap:,.0f}/kWh in {location}, including peak hours.")
+
+if show_capacity:
+    st.subheader("🚦 Charger Capacity Planning (Peak Hour, M/M/c)")
+    max_wait_probability = st.slider("Target Max Probability of Waiting (%)", 1, 100, 20)
+    capacity = capacity_table(sessions_per_day, charging_time, max_chargers=100, profile=site.hourly_profile)
+    meets_target = capacity.index[capacity["Wait Probability"] <= max_wait_probability / 100]
+    if len(meets_target):
+        st.write(f"Chargers needed at {location} for at most {max_wait_probability}% of peak-hour drivers to wait: **{meets_target[0]}**")
+    shown = capacity.loc[:max(num_chargers, meets_target[0] if len(meets_target) else 0) + 5]
+    st.line_chart(shown[["Wait Probability", "Utilization"]])
+    st.dataframe(shown)
+
+if show_fx:
+    st.subheader("💱 FX Exposure (USD Investor View)")
+    fx = st.cache_data(max_entries=16, ttl="1h", show_spinner=False)(fx_paths)(
+        fx_spot, years, fx_path_count, fx_mode, fx_devaluation, fx_volatility, seed=0)
+    upfront = 0.0 if lease_option == "Lease" else capex
+    components = station_components(results.projection, upfront, fx_spot, usd_capex_share, usd_loan,
+                                    upfront * loan_pct / 100)
+    st.dataframe(fx_summary(components, fx, discount_rate))
+    st.line_chart(pd.DataFrame(np.percentile(fx, [10, 50, 90], axis=0).T, columns=["P10", "P50", "P90"],
+                               index=pd.Index(np.arange(years + 1), name="Year")))
+    st.caption("Naira per US dollar along the simulated paths; naira NPV includes the FX cost of any USD equipment or loan.")
+
+if rate_path_mode == "Mean-Reverting":
+    st.subheader("📈 Rate Path Risk")
+    simulated_rates = {
+        name: st.cache_data(max_entries=16, ttl="1h", show_spinner=False)(mean_reverting_paths)(
+            value, years, rate_path_count, rate_persistence, rate_volatility, seed=i)
+        for i, (name, (_, value)) in enumerate(path_rates.items())
+    }
+    path_results = st.cache_data(max_entries=16, ttl="1h", show_spinner=False)(evaluate_scenarios)(
+        scenario, years, capture_rate=capture_rate, rate_paths=simulated_rates)
+    st.dataframe(pd.DataFrame({
+        "NPV (₦)": np.percentile(path_results.npv, [10, 50, 90]),
+        "IRR (%)": np.nanpercentile(path_results.irr, [10, 50, 90]) * 100,
+        "After-Tax NPV (₦)": np.percentile(path_results.after_tax_npv, [10, 50, 90]),
+    }, index=pd.Index(["P10", "P50", "P90"], name="Percentile")))
+    st.line_chart(pd.DataFrame(
+        {f"{label} {p}": np.percentile(simulated_rates[name], q, axis=0)
+         for name, (label, _) in path_rates.items() if name != "revenue_growth"
+         for p, q in (("P10", 10), ("P50", 50), ("P90", 90))},
+        index=pd.Index(np.arange(1, years + 1), name="Year")))
+    st.caption("Rates revert towards the sidebar values; the metrics above use those constant rates.")
 
 # --- Cash Flow Table ---
-df = pd.DataFrame({
-    "Year": [0] + chart_years,
-    "Cash Flow (₦)": cash_flows,
-    "Cumulative CF (₦)": cumulative_cf
-})
 st.subheader("📆 Cash Flow Projection")
-st.dataframe(df)
+st.dataframe(results.cash_flow_table)
+
+if compare_ownership:
+    st.subheader("⚖️ Lease vs Buy")
+    ownership = st.cache_data(max_entries=64, ttl="1h", show_spinner=False)(compare_lease_buy)(
+        scenario, years, periods_per_year, capture_rate, path_arrays).iloc[0]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Buy NPV (₦)", f"{ownership['buy_npv']:,.0f}")
+    col2.metric("Lease NPV (₦)", f"{ownership['lease_npv']:,.0f}")
+    col3.metric("Buying Advantage (₦)", f"{ownership['npv_difference']:,.0f}")
+    crossover = ownership["crossover_rate"]
+    col4.metric("Crossover Discount Rate", f"{crossover * 100:.2f}%" if not np.isnan(crossover) else "N/A")
+    st.caption("Buying is financed as in the sidebar: the equity share is paid upfront and the loan through its "
+               "debt service. At discount rates on the other side of the crossover rate, the other option has the "
+               "higher NPV.")
+
+if loan_pct > 0 and lease_option != "Lease":
+    st.subheader("🏦 Loan Schedule")
+    st.dataframe(results.loan_table.loc[results.loan_table["Payment (₦)"] > 0])
 
 # --- Chart ---
 st.subheader("📈 Revenue vs Cost (Dynamic Over Time)")
-chart_df = pd.DataFrame({
-    "Year": chart_years,
-    "Revenue (₦)": chart_revenue,
-    "Cost (₦)": chart_costs,
-    "Net Cash Flow (₦)": chart_net
-})
-st.line_chart(chart_df.set_index("Year"))
+st.line_chart(results.chart_table.set_index("Year"))
+
+if results.period_table is not None:
+    st.subheader(f"🗓️ {resolution_label} Cash Flow")
+    st.line_chart(results.period_table.set_index("Period"))
+
+# --- Monte Carlo ---
+if run_simulation:
+    st.subheader("🎲 Risk Analysis (Monte Carlo)")
+    distributions = {
+        "sessions_per_day": ("lognormal", sessions_per_day, sessions_per_day * sessions_sd / 100),
+        "price_per_kwh": ("triangular", billed_price * (1 - price_spread / 100), billed_price, billed_price * (1 + price_spread / 100)),
+        "opex_inflation": ("normal", opex_inflation, opex_inflation_sd),
+        "revenue_growth": ("normal", revenue_growth, revenue_growth_sd),
+        "interest_rate": ("normal", interest_rate, interest_rate_sd),
+    }
+    mean_reversion = None
+    if rate_path_mode == "Mean-Reverting":
+        mean_reversion = {name: (rate_persistence, rate_volatility) for name in path_rates}
+    summary = cached_simulate(scenario, distributions, sim_paths, years, seed=0, mean_reversion=mean_reversion,
+                              periods_per_year=periods_per_year, capture_rate=capture_rate, rate_paths=path_arrays)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("P(NPV < 0)", f"{summary.prob_npv_negative:.1%}")
+    col2.metric("IRR Undefined", f"{summary.irr_undefined_share:.1%}")
+    col3.metric("Payback Not Achieved", f"{summary.payback_not_achieved_share:.1%}")
+    st.dataframe(percentile_table(summary))
+
+# --- Two-Way Sensitivity ---
+if show_heatmap:
+    st.subheader("🌡️ Two-Way Sensitivity")
+    names = list(SENSITIVITY_INPUTS)
+    col1, col2, col3 = st.columns(3)
+    x_name = col1.selectbox("X Axis", names, index=names.index("price_per_kwh"), format_func=lambda n: SENSITIVITY_INPUTS[n][0])
+    y_name = col2.selectbox("Y Axis", [n for n in names if n != x_name], format_func=lambda n: SENSITIVITY_INPUTS[n][0])
+    heatmap_metric = col3.selectbox("Metric", ["NPV (₦)", "IRR (%)"])
+    x_label, x_min, x_max = SENSITIVITY_INPUTS[x_name]
+    y_label, y_min, y_max = SENSITIVITY_INPUTS[y_name]
+    x_range = st.slider(f"{x_label} Range", x_min, x_max, (x_min, x_max))
+    y_range = st.slider(f"{y_label} Range", y_min, y_max, (y_min, y_max))
+    resolution = st.slider("Grid Resolution", 20, 200, 100)
+
+    x_values = np.linspace(*x_range, resolution)
+    y_values = np.linspace(*y_range, resolution)
+    npv_grid, irr_grid = cached_sensitivity_grid(scenario, x_name, x_values, y_name, y_values, years,
+                                                 periods_per_year, capture_rate, path_arrays)
+    grid = npv_grid if heatmap_metric == "NPV (₦)" else irr_grid * 100
+
+    fig, ax = plt.subplots()
+    image = ax.imshow(grid, origin="lower", aspect="auto", cmap="RdYlGn",
+                      extent=(x_values[0], x_values[-1], y_values[0], y_values[-1]))
+    ax.plot(scenario[x_name], scenario[y_name], "k*", markersize=12, label="Current inputs")
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.legend(loc="upper left")
+    fig.colorbar(image, ax=ax, label=heatmap_metric)
+    st.pyplot(fig)
+    plt.close(fig)
+
+# --- Tornado Chart ---
+if show_tornado:
+    st.subheader("🌪️ NPV Sensitivity (Tornado)")
+    perturbation = st.slider("Input Change (± %)", 1, 50, 10)
+    swings, base_npv = cached_tornado(scenario, list(SENSITIVITY_INPUTS), perturbation, years, periods_per_year,
+                                      capture_rate, path_arrays)
+    swings = swings.iloc[::-1]
+
+    fig, ax = plt.subplots()
+    labels = [SENSITIVITY_INPUTS[name][0] for name in swings.index]
+    ax.barh(labels, swings["low"] - base_npv, left=base_npv, color="tab:red", label=f"-{perturbation}%")
+    ax.barh(labels, swings["high"] - base_npv, left=base_npv, color="tab:green", label=f"+{perturbation}%")
+    ax.axvline(base_npv, color="black", linewidth=1)
+    ax.set_xlabel("NPV (₦)")
+    ax.legend(loc="lower right")
+    st.pyplot(fig)
+    plt.close(fig)
+
+# --- Portfolio ---
+if show_portfolio:
+    st.subheader("🏢 Station Portfolio")
+    st.write("One row per station, starting from each location's defaults (opex includes land lease); "
+             "financing, growth, inflation and the discount rate come from the sidebar.")
+    registry = location_table()
+    starter_sites = pd.DataFrame({
+        "site": [f"{name} 1" for name in registry.index],
+        "location": registry.index,
+        "sessions_per_day": registry["sessions_per_day"].to_numpy(),
+        "price_per_kwh": np.minimum(billed_price, registry["tariff_cap"]).to_numpy(),
+        "avg_kwh_per_session": avg_kwh_per_session,
+        "chargers": num_chargers,
+        "capex": capex,
+        "opex_monthly": (opex_monthly + registry["land_cost_monthly"]).to_numpy(),
+        "energy_cost_per_kwh": round(unit_energy_cost, 1),
+    })
+    sites = st.data_editor(starter_sites, num_rows="dynamic", hide_index=True, column_config={
+        "site": st.column_config.TextColumn("Site", required=True),
+        "location": st.column_config.SelectboxColumn("Location", options=list(registry.index), required=True),
+        "sessions_per_day": st.column_config.NumberColumn("Sessions/Day", min_value=0),
+        "price_per_kwh": st.column_config.NumberColumn("Price per kWh (₦)", min_value=0),
+        "avg_kwh_per_session": st.column_config.NumberColumn("Avg kWh per Session", min_value=0),
+        "chargers": st.column_config.NumberColumn("Chargers", min_value=1, step=1),
+        "capex": st.column_config.NumberColumn("Setup Cost (₦)", min_value=0),
+        "opex_monthly": st.column_config.NumberColumn("Monthly Opex (₦)", min_value=0),
+        "energy_cost_per_kwh": st.column_config.NumberColumn("Energy Cost (₦/kWh)", min_value=0),
+    }).dropna()
+
+    if len(sites):
+        shared = {name: value for name, value in scenario.items() if name not in sites}
+        site_capture = None
+        if limit_by_capacity:
+            # Erlang B rather than the hourly simulation, so large portfolios recalculate quickly
+            site_capture = erlang_capture_rate(sites["sessions_per_day"].to_numpy(), charging_time,
+                                               sites["chargers"].to_numpy(), years, demand_growth,
+                                               hourly_profiles(sites["location"]))
+        portfolio = st.cache_data(max_entries=64, ttl="1h", show_spinner=False)(evaluate_portfolio)(
+            {**sites.to_dict("series"), **shared}, years, discount_rate, site_capture, path_arrays)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Portfolio NPV (₦)", f"{portfolio.npv:,.0f}")
+        col2.metric("Portfolio IRR (%)", f"{portfolio.irr * 100:.2f}" if not np.isnan(portfolio.irr) else "N/A")
+        col3.metric("Payback Period", f"{int(portfolio.payback)} years" if not np.isnan(portfolio.payback) else "Not achieved")
+        col4.metric("Profitability Index", f"{portfolio.profitability_index:.2f}"
+                    if not np.isnan(portfolio.profitability_index) else "N/A")
+        st.dataframe(site_frame(portfolio, sites["site"].to_numpy()))
+        if limit_by_capacity:
+            st.caption("Site capacity limits use the Erlang B loss formula for each hour of the day.")
+        st.bar_chart(pd.DataFrame({
+            "Year": np.arange(years + 1),
+            "Consolidated Cash Flow (₦)": portfolio.cash_flows,
+        }).set_index("Year"))
 
 # --- Notes ---
 st.markdown("---")
 st.markdown("**Tip:** Use the annual revenue growth and opex inflation sliders to simulate more realistic projections over time.")
+st.markdown("**Rate paths:** enter year-by-year growth, inflation and floating loan rates, or sample them from mean-reverting paths around the sidebar values.")
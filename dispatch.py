@@ -0,0 +1,193 @@
+"""Battery dispatch across solar, grid and diesel supply.
+
+Two modes share one result type: a greedy rule that runs hour by hour over
+arrays of scenarios, and a least-cost linear program (scipy/HiGHS) solved
+for one scenario, either over the whole year or on a rolling horizon. Use
+the greedy rule for sweeps: it dispatches every scenario in one pass, while
+the LP takes about a second per scenario-year.
+"""
+import functools
+from typing import NamedTuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+from utilization import HOURS_PER_YEAR
+
+# Variables per hour in the LP, in this order within each hour's block
+_GRID, _DIESEL, _CHARGE, _DISCHARGE, _SOC, _CURTAIL = range(6)
+_N_VARS = 6
+
+
+class DispatchResult(NamedTuple):
+    grid_import: np.ndarray
+    diesel: np.ndarray
+    charge: np.ndarray
+    discharge: np.ndarray
+    soc: np.ndarray
+    curtailed: np.ndarray
+
+
+def grid_availability(hours_per_day, seed=None, hours=HOURS_PER_YEAR):
+    """Random hourly grid-supply mask averaging `hours_per_day` hours of supply a day."""
+    rng = np.random.default_rng(seed)
+    return rng.random(hours) < hours_per_day / 24
+
+
+def dispatch_greedy(load, pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw,
+                    efficiency=0.9, initial_soc=0.5):
+    """Rule-based dispatch: solar first, battery in outages and expensive hours, then grid, then diesel.
+
+    Surplus solar charges the battery; the battery also charges from the grid
+    in the cheapest quarter of grid hours, and discharges when the grid is
+    down or dearer than its median price. Arrays may carry leading scenario
+    axes (hours last), which are all dispatched together.
+    """
+    load, pv_output = np.broadcast_arrays(np.asarray(load, dtype=float), np.asarray(pv_output, dtype=float))
+    shape = load.shape
+    grid_price = np.broadcast_to(np.asarray(grid_price, dtype=float), shape)
+    grid_available = np.broadcast_to(np.asarray(grid_available, dtype=bool), shape)
+    capacity = np.broadcast_to(np.asarray(battery_kwh, dtype=float), shape[:-1])
+    power = np.broadcast_to(np.asarray(battery_kw, dtype=float), shape[:-1])
+    eta = np.sqrt(efficiency)
+
+    cheap = grid_price <= np.quantile(grid_price, 0.25, axis=-1, keepdims=True)
+    expensive = grid_price > np.median(grid_price, axis=-1, keepdims=True)
+    use_battery = ~grid_available | expensive
+    charge_from_grid = grid_available & cheap
+
+    result = DispatchResult(*(np.zeros(shape) for _ in DispatchResult._fields))
+    soc = capacity * initial_soc
+    net = load - pv_output
+    for t in range(shape[-1]):
+        surplus = np.maximum(-net[..., t], 0)
+        deficit = np.maximum(net[..., t], 0)
+        headroom = np.minimum(power, (capacity - soc) / eta)
+
+        solar_charge = np.minimum(surplus, headroom)
+        discharge = np.where(use_battery[..., t], np.minimum(deficit, np.minimum(power, soc * eta)), 0.0)
+        grid_charge = np.where(charge_from_grid[..., t], headroom - solar_charge, 0.0)
+        remaining = deficit - discharge + grid_charge
+
+        result.charge[..., t] = solar_charge + grid_charge
+        result.discharge[..., t] = discharge
+        result.curtailed[..., t] = surplus - solar_charge
+        result.grid_import[..., t] = np.where(grid_available[..., t], remaining, 0.0)
+        result.diesel[..., t] = np.where(grid_available[..., t], 0.0, remaining)
+        soc = soc + (solar_charge + grid_charge) * eta - discharge / eta
+        result.soc[..., t] = soc
+    return result
+
+
+@functools.lru_cache(maxsize=8)
+def _lp_structure(hours, efficiency):
+    # Equality constraints (energy balance, state-of-charge continuity) depend only on
+    # the horizon length, so they are built once and reused by every window and scenario
+    eta = np.sqrt(efficiency)
+    hour = np.arange(hours)
+
+    def col(var, h=hour):
+        return h * _N_VARS + var
+
+    rows = np.concatenate([hour] * 5)
+    cols = np.concatenate([col(_GRID), col(_DIESEL), col(_DISCHARGE), col(_CHARGE), col(_CURTAIL)])
+    vals = np.concatenate([np.ones(hours)] * 3 + [-np.ones(hours)] * 2)
+    balance = sp.csr_matrix((vals, (rows, cols)), shape=(hours, hours * _N_VARS))
+
+    rows = np.concatenate([hour, hour[1:], hour, hour])
+    cols = np.concatenate([col(_SOC), col(_SOC, hour[:-1]), col(_CHARGE), col(_DISCHARGE)])
+    vals = np.concatenate([np.ones(hours), -np.ones(hours - 1), -eta * np.ones(hours), np.ones(hours) / eta])
+    continuity = sp.csr_matrix((vals, (rows, cols)), shape=(hours, hours * _N_VARS))
+
+    return sp.vstack([balance, continuity]).tocsr()
+
+
+def _solve_window(load, pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw,
+                  efficiency, soc0, cycle_cost):
+    hours = len(load)
+    cost = np.zeros((hours, _N_VARS))
+    cost[:, _GRID] = grid_price
+    cost[:, _DIESEL] = diesel_cost
+    cost[:, _CHARGE] = cycle_cost
+    cost[:, _DISCHARGE] = cycle_cost
+
+    upper = np.empty((hours, _N_VARS))
+    upper[:, _GRID] = np.where(grid_available, np.inf, 0.0)
+    upper[:, _DIESEL] = np.inf
+    upper[:, _CHARGE] = battery_kw
+    upper[:, _DISCHARGE] = battery_kw
+    upper[:, _SOC] = battery_kwh
+    upper[:, _CURTAIL] = pv_output
+
+    rhs = np.concatenate([load - pv_output, np.zeros(hours)])
+    rhs[hours] = soc0
+    bounds = np.column_stack([np.zeros(hours * _N_VARS), upper.ravel()])
+    solution = linprog(cost.ravel(), A_eq=_lp_structure(hours, efficiency), b_eq=rhs, bounds=bounds, method="highs")
+    if not solution.success:
+        raise RuntimeError(f"Battery dispatch LP failed: {solution.message}")
+    return solution.x.reshape(hours, _N_VARS)
+
+
+def dispatch_lp(load, pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw,
+                efficiency=0.9, initial_soc=0.5, horizon=None, step=24, cycle_cost=1.0):
+    """Least-cost dispatch of one scenario as a linear program.
+
+    With `horizon` None the whole year is one LP, the least-cost dispatch
+    with perfect foresight. Otherwise the year is solved as a rolling horizon,
+    an operator who only sees `horizon` hours ahead: each window is optimized,
+    its first `step` hours are committed and the next window starts from the
+    committed state of charge. The windows are solved one after another, so
+    this is slower than the full-year LP, not faster. `cycle_cost` (per kWh
+    charged or discharged) discourages pointless cycling.
+    """
+    load = np.asarray(load, dtype=float)
+    n = len(load)
+    pv_output = np.asarray(pv_output, dtype=float)
+    grid_price = np.broadcast_to(np.asarray(grid_price, dtype=float), (n,))
+    grid_available = np.broadcast_to(np.asarray(grid_available, dtype=bool), (n,))
+    horizon = horizon or n
+    step = n if horizon >= n else step
+
+    plan = np.empty((n, _N_VARS))
+    soc = battery_kwh * initial_soc
+    for start in range(0, n, step):
+        window = slice(start, min(start + horizon, n))
+        x = _solve_window(load[window], pv_output[window], grid_price[window], grid_available[window],
+                          diesel_cost, battery_kwh, battery_kw, efficiency, soc, cycle_cost)
+        committed = min(step, n - start)
+        plan[start:start + committed] = x[:committed]
+        soc = x[committed - 1, _SOC]
+
+    return DispatchResult(plan[:, _GRID], plan[:, _DIESEL], plan[:, _CHARGE], plan[:, _DISCHARGE],
+                          plan[:, _SOC], plan[:, _CURTAIL])
+
+
+def dispatch_cost_per_kwh(result, load, pv_output, grid_price, diesel_cost, solar_cost):
+    """Average cost of each kWh delivered to vehicles: grid, diesel and solar O&M."""
+    solar_used = np.asarray(pv_output) - result.curtailed
+    cost = ((result.grid_import * grid_price).sum(axis=-1) + result.diesel.sum(axis=-1) * diesel_cost
+            + solar_used.sum(axis=-1) * solar_cost)
+    delivered = np.asarray(load).sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(delivered > 0, cost / delivered, 0.0)
+
+
+# Dispatch modes offered in the app, as keyword arguments for run_dispatch
+DISPATCH_MODES = {
+    "Greedy": {"method": "greedy"},
+    "Least-Cost LP (48h foresight)": {"method": "lp", "horizon": 48},
+    "Least-Cost LP (full year)": {"method": "lp", "horizon": None},
+}
+
+
+def run_dispatch(load, pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw,
+                 method="greedy", horizon=None):
+    """Dispatch with the greedy rule or the LP (optionally on a rolling `horizon`).
+
+    Only the greedy rule takes arrays of scenarios; the LP dispatches one.
+    """
+    if method == "greedy":
+        return dispatch_greedy(load, pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw)
+    return dispatch_lp(load, pv_output, grid_price, grid_available, diesel_cost, battery_kwh, battery_kw,
+                       horizon=horizon)
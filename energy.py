@@ -0,0 +1,75 @@
+import functools
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+IRRADIANCE_FILE = Path(__file__).parent / "data" / "lagos_irradiance.csv"
+
+# Share of rated PV output delivered after inverter, temperature, soiling and wiring losses
+PERFORMANCE_RATIO = 0.78
+
+DAYS_PER_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+class EnergyBalance(NamedTuple):
+    load: np.ndarray
+    pv_output: np.ndarray
+    solar_used: np.ndarray
+    grid_import: np.ndarray
+    curtailed: np.ndarray
+    pv_kwp: np.ndarray
+
+
+@functools.lru_cache(maxsize=None)
+def hourly_irradiance():
+    """Typical-year global horizontal irradiance for Lagos, kWh/m2 in each of the 8760 hours.
+
+    Built once from the bundled (month x hour-of-day) table by repeating each
+    month's mean day.
+    """
+    table = pd.read_csv(IRRADIANCE_FILE, comment="#", index_col="month").to_numpy(dtype=float) / 1000
+    irradiance = np.repeat(table, DAYS_PER_MONTH, axis=0).ravel()
+    irradiance.flags.writeable = False
+    return irradiance
+
+
+def charging_load(hourly_sessions, avg_kwh_per_session, charging_time):
+    """Hourly kWh drawn by sessions starting in each hour, spread evenly over the charging time."""
+    hourly_sessions = np.asarray(hourly_sessions, dtype=float)
+    energy = hourly_sessions * avg_kwh_per_session
+    load = np.zeros_like(energy)
+    remaining = charging_time / 60
+    offset = 0
+    while remaining > 0:
+        share = min(remaining, 1.0) / (charging_time / 60)
+        load += np.roll(energy, offset, axis=-1) * share
+        remaining -= 1
+        offset += 1
+    return load
+
+
+def energy_balance(load, solar_percent, performance_ratio=PERFORMANCE_RATIO):
+    """Match hourly charging load against a PV array sized for `solar_percent` of annual load.
+
+    The array is sized so that its annual output equals solar_percent of the
+    annual load; in each hour solar serves the load first, the grid covers the
+    rest and unused solar is curtailed. `load` has hours along its last axis.
+    """
+    load = np.asarray(load, dtype=float)
+    yield_per_kwp = hourly_irradiance() * performance_ratio
+    pv_kwp = load.sum(axis=-1) * np.asarray(solar_percent, dtype=float) / 100 / yield_per_kwp.sum()
+    pv_output = pv_kwp[..., np.newaxis] * yield_per_kwp
+    solar_used = np.minimum(pv_output, load)
+    return EnergyBalance(load, pv_output, solar_used, load - solar_used, pv_output - solar_used, pv_kwp)
+
+
+def annual_energy_summary(balance):
+    """Annual kWh totals of an energy balance, as a dict of floats (or arrays for batches)."""
+    return {
+        "Charging Load (kWh)": balance.load.sum(axis=-1),
+        "Solar Used (kWh)": balance.solar_used.sum(axis=-1),
+        "Grid Import (kWh)": balance.grid_import.sum(axis=-1),
+        "Curtailed Solar (kWh)": balance.curtailed.sum(axis=-1),
+    }
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+import metrics
+
+# Exchange-rate path generators offered in the app
+FX_MODES = ("deterministic", "gbm", "regime")
+
+
+class Component(NamedTuple):
+    """A cash-flow stream in its own currency ("NGN" or "USD"), year 0 first along the last axis."""
+    values: np.ndarray
+    currency: str
+
+
+def fx_paths(spot, years, paths=1, mode="deterministic", devaluation=10.0, volatility=15.0,
+             crisis_probability=10.0, crisis_devaluation=40.0, recovery_probability=50.0, seed=None):
+    """Naira per US dollar in years 0..years along `paths` simulated paths, shape (paths, years + 1).
+
+    Rates are in percent a year. "deterministic" devalues the naira by
+    `devaluation` each year; "gbm" is geometric Brownian motion with that
+    expected devaluation and `volatility`; "regime" switches between a calm
+    regime (as gbm) and a crisis regime devaluing by `crisis_devaluation`
+    with twice the volatility, entered with `crisis_probability` and left
+    with `recovery_probability` each year.
+    """
+    if mode not in FX_MODES:
+        raise ValueError(f"Unknown FX mode: {mode}")
+    year = np.arange(years + 1)
+    drift = np.log1p(devaluation / 100)
+    if mode == "deterministic":
+        return np.broadcast_to(spot * np.exp(drift * year), (paths, years + 1)).copy()
+
+    rng = np.random.default_rng(seed)
+    sigma = np.full((paths, years), volatility / 100)
+    mu = np.full((paths, years), drift)
+    if mode == "regime":
+        crisis = np.zeros((paths, years), dtype=bool)
+        state = np.zeros(paths, dtype=bool)
+        switch = rng.random((paths, years)) * 100
+        for t in range(years):
+            state = np.where(state, switch[:, t] >= recovery_probability, switch[:, t] < crisis_probability)
+            crisis[:, t] = state
+        mu = np.where(crisis, np.log1p(crisis_devaluation / 100), mu)
+        sigma = np.where(crisis, 2 * sigma, sigma)
+
+    log_steps = mu - sigma ** 2 / 2 + sigma * rng.standard_normal((paths, years))
+    return spot * np.exp(np.concatenate([np.zeros((paths, 1)), np.cumsum(log_steps, axis=-1)], axis=-1))
+
+
+def convert(components, fx, currency="USD"):
+    """Sum currency-tagged components into one currency along every FX path."""
+    total = 0.0
+    for component in components:
+        if component.currency == currency:
+            total = total + component.values
+        elif currency == "USD":
+            total = total + component.values / fx
+        else:
+            total = total + component.values * fx
+    return np.broadcast_to(total, np.broadcast_shapes(np.shape(total), fx.shape))
+
+
+def station_components(projection, capex, spot, usd_capex_share=0.0, usd_loan=False, loan=0.0):
+    """Tag the cash flows of an annual projection by currency, year 0 first.
+
+    Revenue and operating costs are in naira. `usd_capex_share` percent of
+    the equipment spending (the initial capex at `spot` and any later
+    replacements or salvage) is priced in dollars. The `loan` drawn in year 0
+    and its debt service (both in naira at `spot`) are owed in dollars with
+    `usd_loan`.
+    """
+    def with_year_0(values, first=0.0):
+        values = np.asarray(values, dtype=float)
+        return np.concatenate([np.broadcast_to(first, values.shape[:-1] + (1,)), values], axis=-1)
+
+    operating = projection.revenue - projection.opex - projection.energy_cost - projection.lease_payment
+    equipment = with_year_0(projection.net_cash - operating + projection.debt_service, -np.asarray(capex, dtype=float))
+    usd = usd_capex_share / 100
+    debt = with_year_0(-projection.debt_service, loan)
+    return [
+        Component(with_year_0(operating), "NGN"),
+        Component(equipment * (1 - usd), "NGN"),
+        Component(equipment * usd / spot, "USD"),
+        Component(debt / spot, "USD") if usd_loan else Component(debt, "NGN"),
+    ]
+
+
+def fx_summary(components, fx, discount_rate, percentiles=(10, 50, 90)):
+    """USD IRR and naira NPV of tagged cash flows across FX paths, as a percentile table.
+
+    Paths without a USD IRR are left out of its percentiles.
+    """
+    usd_irr = metrics.irr(convert(components, fx, "USD"))
+    ngn_npv = metrics.npv(discount_rate / 100, convert(components, fx, "NGN"))
+    return pd.DataFrame({
+        "USD IRR (%)": np.nanpercentile(usd_irr, percentiles) * 100,
+        "NPV (₦)": np.percentile(ngn_npv, percentiles),
+    }, index=pd.Index([f"P{p}" for p in percentiles], name="Percentile"))
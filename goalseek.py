@@ -0,0 +1,75 @@
+import numpy as np
+
+from scenarios import npv_scenarios, scenario_inputs
+
+# Starting search interval per goal-seek target; the upper end is widened as needed
+DEFAULT_BRACKETS = {
+    "price_per_kwh": (0.0, 1_000.0),
+    "sessions_per_day": (0.0, 200.0),
+    "avg_kwh_per_session": (0.0, 50.0),
+    "capex": (0.0, 50_000_000.0),
+}
+
+
+def goal_seek(table, target, years, bracket=None, xtol=1e-10, max_iter=100, max_expansions=60,
+              **engine_options):
+    """Value of `target` at which NPV = 0 over the full projection, for every scenario row.
+
+    Each row is bracketed from `bracket` (defaulting to DEFAULT_BRACKETS),
+    doubling the upper end until NPV changes sign, and then solved with
+    Illinois-modified secant steps. `engine_options` (periods_per_year,
+    capture_rate, rate_paths) are passed on to npv_scenarios, so the root is
+    found at the same resolution the NPV is reported at. Returns (values, converged); values are NaN where no root
+    lies at or above the lower end.
+    """
+    p = scenario_inputs(table)
+    n = len(p[target])
+    lo, hi = bracket or DEFAULT_BRACKETS[target]
+
+    def npv_at(values, rows):
+        subset = {name: column[rows] for name, column in p.items()}
+        subset[target] = values
+        return npv_scenarios(subset, years, **engine_options)
+
+    everything = np.arange(n)
+    a = np.full(n, float(lo))
+    b = np.full(n, float(hi))
+    fa = npv_at(a, everything)
+    fb = npv_at(b, everything)
+
+    # Widen the bracket upwards until NPV changes sign
+    for _ in range(max_expansions):
+        open_rows = np.flatnonzero(np.sign(fa) == np.sign(fb))
+        if not len(open_rows):
+            break
+        b[open_rows] = a[open_rows] + 2 * (b[open_rows] - a[open_rows])
+        fb[open_rows] = npv_at(b[open_rows], open_rows)
+
+    bracketed = (np.sign(fa) != np.sign(fb)) | (fa == 0) | (fb == 0)
+    root = np.where(fa == 0, a, b)
+    converged = ~bracketed | (fa == 0) | (fb == 0)
+    side = np.zeros(n)
+
+    for _ in range(max_iter):
+        rows = np.flatnonzero(~converged)
+        if not len(rows):
+            break
+        ra, rb, rfa, rfb = a[rows], b[rows], fa[rows], fb[rows]
+        c = (ra * rfb - rb * rfa) / (rfb - rfa)
+        fc = npv_at(c, rows)
+
+        # Keep the root bracketed; halve the stale end's value when the same end is kept twice
+        replace_b = np.sign(fc) == np.sign(rfb)
+        rfa = np.where(replace_b & (side[rows] == -1), rfa / 2, rfa)
+        rfb = np.where(~replace_b & (side[rows] == 1), rfb / 2, rfb)
+        a[rows] = np.where(replace_b, ra, c)
+        fa[rows] = np.where(replace_b, rfa, fc)
+        b[rows] = np.where(replace_b, c, rb)
+        fb[rows] = np.where(replace_b, fc, rfb)
+        side[rows] = np.where(replace_b, -1, 1)
+
+        root[rows] = c
+        converged[rows] = (fc == 0) | (np.abs(b[rows] - a[rows]) <= xtol * np.maximum(np.abs(c), 1))
+
+    converged &= bracketed
+    return np.where(converged, root, np.nan), converged
@@ -0,0 +1,32 @@
+import numpy as np
+
+from projection import _geometric_sum
+
+
+def _column(value):
+    return np.asarray(value, dtype=float)[..., np.newaxis]
+
+
+def lease_schedule(capex, years, rate=15.0, term=np.nan, escalation=0.0, buyout_pct=0.0):
+    """Lease payments in years 1..years for equipment worth `capex`.
+
+    The first year's rent is rate percent of capex, escalating by
+    `escalation` percent a year for `term` years (NaN: the whole projection);
+    the buyout, buyout_pct percent of capex, is paid with the last rent.
+    """
+    capex, term = _column(capex), _column(term)
+    term = np.where(np.isnan(term), np.inf, term)
+    year = np.arange(1, years + 1)
+    rent = capex * _column(rate) / 100 * (1 + _column(escalation) / 100) ** (year - 1)
+    return np.where(year <= term, rent, 0.0) + np.where(year == term, capex * _column(buyout_pct) / 100, 0.0)
+
+
+def lease_present_value(capex, years, discount_rate, rate=15.0, term=np.nan, escalation=0.0, buyout_pct=0.0):
+    """Present value of lease_schedule(...) at `discount_rate` percent, in closed form."""
+    capex, term = np.asarray(capex, dtype=float), np.asarray(term, dtype=float)
+    d = 1 / (1 + np.asarray(discount_rate, dtype=float) / 100)
+    growth = 1 + np.asarray(escalation, dtype=float) / 100
+    paid_years = np.clip(np.floor(np.where(np.isnan(term), years, term)), 0, years)
+    buyout = np.where(term <= years, capex * np.asarray(buyout_pct, dtype=float) / 100 * d ** np.nan_to_num(term), 0.0)
+    return capex * np.asarray(rate, dtype=float) / 100 * _geometric_sum(growth * d, paid_years) / growth + buyout
+
@@ -0,0 +1,88 @@
+import numpy as np
+from typing import NamedTuple
+
+
+class AssetClass(NamedTuple):
+    capex_share: float
+    life: int
+    cost_trend: float
+    degradation: float
+    salvage_pct: float
+
+
+# Split of the setup cost into asset classes: share of capex, service life (years), annual
+# change in replacement cost (%), efficiency lost per year of age (%) and the share of the
+# purchase cost recovered when a worn-out unit is sold (%)
+ASSET_CLASSES = {
+    "Chargers": AssetClass(0.50, 10, -3.0, 0.5, 10.0),
+    "Batteries": AssetClass(0.15, 8, -6.0, 2.5, 5.0),
+    "Inverters": AssetClass(0.10, 12, -2.0, 0.5, 5.0),
+    "Civil Works": AssetClass(0.25, 25, 5.0, 0.0, 0.0),
+}
+
+
+class Lifecycle(NamedTuple):
+    replacement: np.ndarray
+    salvage: np.ndarray
+    efficiency: np.ndarray
+
+
+def replacement_events(years, classes=ASSET_CLASSES):
+    """(asset class index, year) of every replacement within years 1..years, as sparse event arrays."""
+    events = [(i, year) for i, asset in enumerate(classes.values())
+              for year in range(asset.life, years + 1, asset.life)]
+    index, year = np.array(events, dtype=int).reshape(-1, 2).T
+    return index, year
+
+
+def lifecycle(capex, years, classes=ASSET_CLASSES):
+    """Replacement spending, salvage receipts and equipment efficiency in years 1..years.
+
+    Each asset class is bought with the initial `capex` and replaced every
+    `life` years at a cost following its cost trend. Worn-out units are sold
+    for their salvage share, and in the final year every unit still in
+    service is credited at its straight-line book value (at least its salvage
+    share) as terminal value. Replacements are a handful of sparse events, so
+    they are scattered into (N, years) arrays without a loop over years.
+    `efficiency` is the capex-weighted share of rated efficiency left after
+    degradation, which resets when a unit is replaced (1 where capex is 0,
+    e.g. for leased equipment).
+    """
+    capex = np.asarray(capex, dtype=float)[..., np.newaxis]
+    share, life, trend, degradation, salvage_pct = (np.array(values, dtype=float) for values in zip(*classes.values()))
+
+    def unit_cost(index, year):
+        return capex * share[index] * (1 + trend[index] / 100) ** year
+
+    index, year = replacement_events(years, classes)
+    replacement = np.zeros(capex.shape[:-1] + (years,))
+    salvage = np.zeros_like(replacement)
+    np.add.at(np.moveaxis(replacement, -1, 0), year - 1, np.moveaxis(unit_cost(index, year), -1, 0))
+    np.add.at(np.moveaxis(salvage, -1, 0), year - 1,
+              np.moveaxis(unit_cost(index, year - life[index]) * salvage_pct[index] / 100, -1, 0))
+
+    # Terminal value of the units in service at the end of the projection
+    classes_index = np.arange(len(share))
+    last_purchase = years // life * life
+    book_share = np.maximum(1 - (years - last_purchase) / life, salvage_pct / 100)
+    salvage[..., -1] += (unit_cost(classes_index, last_purchase) * book_share).sum(axis=-1)
+
+    age = (np.arange(1, years + 1)[:, np.newaxis] - 1) % life
+    efficiency = 1 - ((1 - (1 - degradation / 100) ** age) * share).sum(axis=-1)
+    efficiency = np.where(capex > 0, efficiency, 1.0)
+    return Lifecycle(replacement, salvage, efficiency)
+
+
+def apply_lifecycle(projection, capex, classes=ASSET_CLASSES):
+    """Add replacements, salvage and degradation to an annual projection.
+
+    Degraded equipment needs more energy per kWh delivered, so the energy
+    cost is divided by the efficiency. Returns the adjusted projection and the
+    Lifecycle arrays.
+    """
+    cycle = lifecycle(capex, len(projection.years), classes)
+    energy_cost = projection.energy_cost / cycle.efficiency
+    costs = projection.costs + (energy_cost - projection.energy_cost) + cycle.replacement
+    adjusted = projection._replace(energy_cost=energy_cost, costs=costs,
+                                   net_cash=projection.revenue - costs + cycle.salvage)
+    return adjusted, cycle
@@ -0,0 +1,47 @@
+import functools
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+LOCATIONS_FILE = Path(__file__).parent / "data" / "locations.csv"
+
+_HOUR_COLUMNS = [f"h{hour:02d}" for hour in range(24)]
+
+
+class Location(NamedTuple):
+    name: str
+    sessions_per_day: float
+    grid_hours: float
+    land_cost_monthly: float
+    tariff_cap: float
+    hourly_profile: np.ndarray
+
+
+@functools.lru_cache(maxsize=None)
+def location_table():
+    """Bundled per-location defaults indexed by location name, read on first use.
+
+    The hourly demand columns h00..h23 are normalized to shares of daily demand.
+    """
+    table = pd.read_csv(LOCATIONS_FILE, comment="#", index_col="location")
+    table[_HOUR_COLUMNS] = table[_HOUR_COLUMNS].div(table[_HOUR_COLUMNS].sum(axis=1), axis=0)
+    return table
+
+
+def location_names():
+    return list(location_table().index)
+
+
+def get_location(name):
+    """Defaults for one location from the registry."""
+    row = location_table().loc[name]
+    return Location(name, float(row["sessions_per_day"]), float(row["grid_hours"]),
+                    float(row["land_cost_monthly"]), float(row["tariff_cap"]),
+                    row[_HOUR_COLUMNS].to_numpy(dtype=float))
+
+
+def hourly_profiles(names):
+    """Hourly demand shares for each named location, shape (len(names), 24)."""
+    return location_table().loc[list(names), _HOUR_COLUMNS].to_numpy(dtype=float)
@@ -0,0 +1,147 @@
+import numpy as np
+
+
+def discount_factors(rate, periods):
+    """Discount factors for periods 0..periods-1, one row per rate."""
+    rate = np.asarray(rate, dtype=float)[..., np.newaxis]
+    return (1 + rate) ** -np.arange(periods)
+
+
+def npv(rate, cash_flows):
+    """Net present value of each row of cash flows, period 0 undiscounted (as npf.npv)."""
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    return (cash_flows * discount_factors(rate, cash_flows.shape[-1])).sum(axis=-1)
+
+
+# Discount-factor grid v = 1 / (1 + rate) used to bracket IRR roots (rates from ~-99% to ~1e5%)
+_BRACKET_GRID = np.concatenate([np.geomspace(1e-3, 1, 40), np.geomspace(1, 100, 25)[1:]])
+
+
+def _polyval(cash_flows, v):
+    # NPV as a polynomial in v and its derivative, evaluated row-wise by Horner's rule
+    value = np.zeros_like(v)
+    slope = np.zeros_like(v)
+    for c in cash_flows.T[::-1]:
+        slope = slope * v + value
+        value = value * v + c
+    return value, slope
+
+
+def _refine(rows, lo, hi, f_lo, tol, max_iter):
+    # Newton steps inside each [lo, hi] bracket of the discount factor, falling back to bisection
+    v = (lo + hi) / 2
+    converged = np.zeros(len(v), dtype=bool)
+    for _ in range(max_iter):
+        active = ~converged
+        if not active.any():
+            break
+        f, df = _polyval(rows[active], v[active])
+        a, b, fa = lo[active], hi[active], f_lo[active]
+
+        # Shrink the bracket around the current estimate
+        same_side = np.sign(f) == np.sign(fa)
+        a = np.where(same_side, v[active], a)
+        fa = np.where(same_side, f, fa)
+        b = np.where(same_side, b, v[active])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = v[active] - f / df
+        inside = np.isfinite(newton) & (newton >= a) & (newton <= b)
+        step = np.where(f == 0, v[active], np.where(inside, newton, (a + b) / 2))
+
+        done = (np.abs(step - v[active]) <= tol * step ** 2) | (b - a <= tol * a ** 2)
+        lo[active], hi[active], f_lo[active], v[active] = a, b, fa, step
+        converged[active] = done
+    return v, converged
+
+
+def _turning_point(rows, lo, hi, iterations=60):
+    # Discount factor where NPV turns within [lo, hi], by bisection on the sign of its slope
+    _, slope_lo = _polyval(rows, lo)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        _, slope = _polyval(rows, mid)
+        same = np.sign(slope) == np.sign(slope_lo)
+        lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+    return (lo + hi) / 2
+
+
+def solve_irr(cash_flows, tol=1e-10, max_iter=100):
+    """IRR of every row of a cash-flow matrix.
+
+    Roots are bracketed on a grid of discount factors. On each side of zero
+    the sign change nearest zero is refined by Newton steps that fall back to
+    bisection when a step leaves the bracket, and the root closest to zero is
+    kept (as npf.irr picks it). A grid cell where NPV turns back towards zero
+    without changing sign is split at its turning point, so pairs of roots
+    within one cell are found too. Returns (irr, converged); irr is NaN where
+    no root was found, including rows of zeros.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    shape = cash_flows.shape[:-1]
+    rows = cash_flows.reshape(-1, cash_flows.shape[-1])
+    scale = np.abs(rows).max(axis=1, keepdims=True)
+    rows = rows / np.where(scale > 0, scale, 1.0)
+    n = len(rows)
+
+    # The grid is shared by all rows, so NPV and its slope on it are matrix products
+    power = np.arange(rows.shape[1])[:, np.newaxis]
+    f_grid = rows @ _BRACKET_GRID ** power
+    df_grid = rows[:, 1:] @ (power[1:] * _BRACKET_GRID ** (power[1:] - 1))
+    positive, zero = f_grid > 0, f_grid == 0
+    crosses = (positive[:, :-1] != positive[:, 1:]) | zero[:, :-1] | zero[:, 1:]
+    crosses &= (scale > 0)
+    # Cells heading towards zero at the left end and away from it at the right may hide two roots
+    heading = f_grid * df_grid
+    turns = ~crosses & (heading[:, :-1] < 0) & (heading[:, 1:] > 0)
+
+    # On the positive-rate side (v < 1) the cell nearest rate 0 is the last one, on the
+    # negative-rate side (v > 1) the first one
+    split = np.searchsorted(_BRACKET_GRID, 1.0)
+    row, lo, hi, f_lo = [], [], [], []
+    for mask in (crosses, turns):
+        for cells, offset, step in ((mask[:, split - 1::-1], split - 1, -1), (mask[:, split:], split, 1)):
+            found = np.flatnonzero(cells.any(axis=1))
+            cell = offset + step * cells[found].argmax(axis=1)
+            a, b, fa = _BRACKET_GRID[cell], _BRACKET_GRID[cell + 1], f_grid[found, cell]
+            if mask is crosses:
+                row.append(found), lo.append(a), hi.append(b), f_lo.append(fa)
+                continue
+            # Two brackets either side of the turning point, where NPV has crossed zero
+            turn = _turning_point(rows[found], a, b)
+            f_turn, _ = _polyval(rows[found], turn)
+            both = np.sign(f_turn) != np.sign(fa)
+            row += [found[both]] * 2
+            lo += [a[both], turn[both]]
+            hi += [turn[both], b[both]]
+            f_lo += [fa[both], f_turn[both]]
+
+    # Refine every bracket in one stacked pass and keep each row's root closest to zero
+    row = np.concatenate(row)
+    v, converged = _refine(rows[row], *(np.concatenate(x) for x in (lo, hi, f_lo)), tol, max_iter)
+    with np.errstate(divide="ignore"):
+        distance = np.where(converged, np.abs(1 / v - 1), np.inf)
+    order = np.lexsort((distance, row))
+    first = order[np.diff(row[order], prepend=-1) != 0]
+    first = first[np.isfinite(distance[first])]
+    rate = np.full(n, np.nan)
+    rate[row[first]] = 1 / v[first] - 1
+    return rate.reshape(shape), (~np.isnan(rate)).reshape(shape)
+
+
+def irr(cash_flows):
+    """IRR of each row of cash flows, NaN where no solution exists."""
+    return solve_irr(cash_flows)[0]
+
+
+def payback_period(cash_flows):
+    """First year in which cumulative cash flow turns positive, NaN if not achieved."""
+    positive = np.cumsum(cash_flows, axis=-1) > 0
+    return np.where(positive.any(axis=-1), positive.argmax(axis=-1), np.nan)
+
+
+def profitability_index(npv_value, investment):
+    """Present value returned per naira invested in year 0, NaN where nothing is invested."""
+    investment = np.asarray(investment, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(investment > 0, (npv_value + investment) / investment, np.nan)
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+import metrics
+from amortization import amortize, annual_schedule, whole_years
+from goalseek import goal_seek
+from lease import lease_schedule
+from lifecycle import apply_lifecycle
+from projection import Projection, aggregate, cash_flow_series, project, project_periods
+from rate_paths import path_matrix
+from tax import after_tax_cash_flows
+
+
+class ModelResults(NamedTuple):
+    npv: float
+    irr: float
+    payback: float
+    profitability_index: float
+    after_tax_npv: float
+    after_tax_irr: float
+    breakeven_price: float
+    cash_flow_table: pd.DataFrame
+    chart_table: pd.DataFrame
+    period_table: pd.DataFrame
+    loan_table: pd.DataFrame
+    projection: Projection
+
+
+def _one_path(result):
+    # Drop the leading axis a (1, years) rate path adds to a single station's arrays
+    return type(result)(*(np.reshape(x, np.shape(x)[-1:]) for x in result))
+
+
+def run_model(sessions_per_day, avg_kwh_per_session, price_per_kwh, capex, opex_monthly,
+              opex_inflation, revenue_growth, loan_pct, loan_term, interest_rate, lease,
+              years, discount_rate, periods_per_year=1, capture_rate=None, energy_cost_per_kwh=None,
+              grace_years=0, balloon_pct=0.0, allowance_life=5, declining_rate=0.0,
+              lease_rate=15.0, lease_term=None, lease_escalation=0.0, lease_buyout_pct=0.0, lifecycle=False,
+              rate_paths=None):
+    """Financial core of the app for a single station.
+
+    A pure function of scalar sidebar inputs (percentages as entered), so its
+    results can be cached on the argument values. `payback` and `irr` are NaN
+    when not achieved within the projection, `breakeven_price` when no tariff
+    reaches NPV = 0.
+
+    With `periods_per_year` of 12 (monthly) or 365 (daily) the projection and
+    loan amortization run per period and are summed to the annual views used
+    for the metrics; `period_table` then holds the periodic cash flows.
+    `capture_rate` is a tuple with the share of demand served in each year
+    (see utilization.simulate_utilization); None means all demand is served.
+    `energy_cost_per_kwh` comes from the energy dispatch (see dispatch.py); None
+    keeps the flat share-of-revenue estimate. The loan is amortized per
+    period with `grace_years` of interest-only payments and a final balloon of
+    `balloon_pct` of the loan; `loan_table` holds its annual schedule.
+    Year 0 carries only the equity share of capex, as the loan is repaid
+    through the debt service.
+    After-tax metrics deduct loan interest and capital allowances on `capex`
+    (straight line over `allowance_life` years, or declining balance at
+    `declining_rate` percent) before company income tax (see tax.py); with
+    `lifecycle`, replacements earn allowances too and salvage is taxed.
+    With `lease` the equipment is rented instead of bought: there is no
+    upfront capex or loan, and rent of `lease_rate` percent of capex escalates
+    by `lease_escalation` percent a year for `lease_term` years (None: the
+    whole projection), ending with a buyout of `lease_buyout_pct` of capex.
+    With `lifecycle`, purchased equipment is replaced, degrades and is
+    credited with salvage and terminal value (see lifecycle.py) in the annual
+    views; `period_table` keeps the operating cash flows. `projection` is the
+    annual projection behind the tables, e.g. for fx.station_components.
+    `rate_paths` maps "revenue_growth", "opex_inflation" or "interest_rate"
+    to a tuple of year-by-year rates (percent, the last one held) that
+    replaces the constant input; a floating interest rate re-sets the loan
+    payment each year. `loan_term` is rounded to whole years, as for
+    scenarios.scenario_inputs.
+    """
+    # --- Calculations ---
+    sessions_per_year = sessions_per_day * 365
+    revenue_per_year = sessions_per_year * avg_kwh_per_session * price_per_kwh
+
+    paths = {name: path_matrix(values, years) for name, values in (rate_paths or {}).items()}
+    growth = paths.get("revenue_growth", revenue_growth)
+    inflation = paths.get("opex_inflation", opex_inflation)
+    loan_rate = np.repeat(paths["interest_rate"], periods_per_year, axis=-1) if "interest_rate" in paths else interest_rate
+
+    upfront = 0.0 if lease else capex
+    loan_term = float(whole_years(loan_term))
+    loan_amount = upfront * loan_pct / 100 if loan_term > 0 else 0.0
+    schedule = _one_path(amortize(loan_amount, loan_rate, loan_term, years * periods_per_year, periods_per_year,
+                                  grace_years * periods_per_year, balloon_pct))
+    opex_yearly = opex_monthly * 12
+    leases = lease_schedule(capex, years, lease_rate, np.nan if lease_term is None else lease_term,
+                            lease_escalation, lease_buyout_pct) * bool(lease)
+    capture = 1.0 if capture_rate is None else np.asarray(capture_rate)
+    energy_cost_per_year = None if energy_cost_per_kwh is None else sessions_per_year * avg_kwh_per_session * energy_cost_per_kwh
+
+    # Project all years (or periods) at once
+    period_table = None
+    if periods_per_year == 1:
+        projection = _one_path(project(revenue_per_year, opex_yearly, growth, inflation,
+                                       0.0, loan_term, 0.0, years, capture, energy_cost_per_year,
+                                       schedule.payment, leases))
+    else:
+        periods = _one_path(project_periods(revenue_per_year, opex_yearly, growth, inflation,
+                                            0.0, loan_term, 0.0, years, periods_per_year, capture,
+                                            energy_cost_per_year, schedule.payment, leases))
+        projection = aggregate(periods, periods_per_year)
+        period_table = pd.DataFrame({
+            "Period": periods.years,
+            "Revenue (₦)": periods.revenue,
+            "Cost (₦)": periods.costs,
+            "Net Cash Flow (₦)": periods.net_cash
+        })
+    cycle = None
+    if lifecycle:
+        projection, cycle = apply_lifecycle(projection, upfront)
+    cash_flows = cash_flow_series(upfront - loan_amount, projection.net_cash)
+    loans = annual_schedule(schedule, periods_per_year)
+    taxes, after_tax = after_tax_cash_flows(projection, loans.interest, upfront, allowance_life, declining_rate,
+                                            loan_amount, cycle)
+
+    # Financial Metrics
+    npv = metrics.npv(discount_rate / 100, cash_flows)
+    after_tax_npv = metrics.npv(discount_rate / 100, after_tax)
+
+    # Tariff at which NPV = 0 over the full projection
+    scenario = {
+        "sessions_per_day": sessions_per_day, "avg_kwh_per_session": avg_kwh_per_session,
+        "price_per_kwh": price_per_kwh, "capex": capex, "opex_monthly": opex_monthly,
+        "opex_inflation": opex_inflation, "revenue_growth": revenue_growth, "loan_pct": loan_pct,
+        "loan_term": loan_term, "interest_rate": interest_rate, "lease": lease, "discount_rate": discount_rate,
+        "energy_cost_per_kwh": np.nan if energy_cost_per_kwh is None else energy_cost_per_kwh,
+        "grace_years": grace_years, "balloon_pct": balloon_pct,
+        "allowance_life": allowance_life, "declining_rate": declining_rate,
+        "lease_rate": lease_rate, "lease_term": np.nan if lease_term is None else lease_term,
+        "lease_escalation": lease_escalation, "lease_buyout_pct": lease_buyout_pct,
+        "lifecycle": lifecycle,
+    }
+    breakeven_price = goal_seek(scenario, "price_per_kwh", years, periods_per_year=periods_per_year,
+                                capture_rate=capture_rate, rate_paths=paths or None)[0][0]
+
+    cash_flow_table = pd.DataFrame({
+        "Year": np.arange(years + 1),
+        "Cash Flow (₦)": cash_flows,
+        "Cumulative CF (₦)": np.cumsum(cash_flows),
+        "Tax (₦)": np.concatenate([[0.0], taxes.tax]),
+        "After-Tax CF (₦)": after_tax,
+    })
+    loan_table = pd.DataFrame({
+        "Year": loans.periods,
+        "Payment (₦)": loans.payment,
+        "Interest (₦)": loans.interest,
+        "Principal (₦)": loans.principal,
+        "Closing Balance (₦)": loans.balance,
+    })
+    chart_table = pd.DataFrame({
+        "Year": projection.years,
+        "Revenue (₦)": projection.revenue,
+        "Cost (₦)": projection.costs,
+        "Net Cash Flow (₦)": projection.net_cash
+    })
+
+    return ModelResults(
+        npv=float(npv),
+        irr=float(metrics.irr(cash_flows)),
+        payback=float(metrics.payback_period(cash_flows)),
+        profitability_index=float(metrics.profitability_index(npv, upfront - loan_amount)),
+        after_tax_npv=float(after_tax_npv),
+        after_tax_irr=float(metrics.irr(after_tax)),
+        breakeven_price=float(breakeven_price),
+        cash_flow_table=cash_flow_table,
+        chart_table=chart_table,
+        period_table=period_table,
+        loan_table=loan_table,
+        projection=projection,
+    )
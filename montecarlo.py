@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+from rate_paths import mean_reverting_paths
+from scenarios import SCENARIO_DEFAULTS, evaluate_scenarios
+
+# Uncertain inputs and their default distributions, as (kind, *params).
+# "normal"/"lognormal" take (mean, std), "triangular" (low, mode, high), "uniform" (low, high).
+DEFAULT_DISTRIBUTIONS = {
+    "sessions_per_day": ("lognormal", 50, 15),
+    "price_per_kwh": ("triangular", 250, 300, 350),
+    "opex_inflation": ("normal", 5.0, 2.0),
+    "revenue_growth": ("normal", 3.0, 2.0),
+    "interest_rate": ("normal", 10.0, 2.0),
+}
+
+# Inputs that cannot go negative
+_NON_NEGATIVE = {"sessions_per_day", "avg_kwh_per_session", "price_per_kwh", "capex", "opex_monthly", "interest_rate"}
+
+
+def draw(spec, size, rng):
+    """Draw `size` samples for one (kind, *params) distribution spec."""
+    kind, *params = spec
+    if kind == "normal":
+        return rng.normal(params[0], params[1], size)
+    if kind == "lognormal":
+        mean, std = params
+        sigma2 = np.log1p((std / mean) ** 2)
+        return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)
+    if kind == "triangular":
+        if params[0] == params[2]:
+            return np.full(size, float(params[1]))
+        return rng.triangular(params[0], params[1], params[2], size)
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1], size)
+    if kind == "fixed":
+        return np.full(size, float(params[0]))
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+class QuantileSketch:
+    """Streaming quantile estimate from a bounded set of weighted centroids.
+
+    Each update merges the new values into the centroids and, once there are
+    more than `size`, re-buckets them into `size` groups of equal weight, so
+    memory stays fixed however many values are seen.
+    """
+
+    def __init__(self, size=2000):
+        self.size = size
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float).ravel()
+        x = x[~np.isnan(x)]
+        if not len(x):
+            return
+        self.count += len(x)
+        self.min = min(self.min, x.min())
+        self.max = max(self.max, x.max())
+        values = np.concatenate([self.values, x])
+        weights = np.concatenate([self.weights, np.ones(len(x))])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        if len(values) > self.size:
+            centre = np.cumsum(weights) - weights / 2
+            bucket = np.minimum((centre / centre[-1] * self.size).astype(int), self.size - 1)
+            total = np.bincount(bucket, weights, self.size)
+            keep = total > 0
+            values = np.bincount(bucket, weights * values, self.size)[keep] / total[keep]
+            weights = total[keep]
+        self.values, self.weights = values, weights
+
+    def quantile(self, q):
+        if not self.count:
+            return np.full(np.shape(q), np.nan)
+        centre = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.concatenate([[0], centre, [self.count]])
+        values = np.concatenate([[self.min], self.values, [self.max]])
+        return np.interp(np.asarray(q) * self.count, ranks, values)
+
+
+class SimulationSummary(NamedTuple):
+    paths: int
+    npv: QuantileSketch
+    irr: QuantileSketch
+    payback: QuantileSketch
+    prob_npv_negative: float
+    irr_undefined_share: float
+    payback_not_achieved_share: float
+
+
+def simulate(base, distributions, paths, years, chunk_size=100_000, seed=None, sketch_size=2000,
+             mean_reversion=None, periods_per_year=1, capture_rate=None, rate_paths=None):
+    """Monte Carlo over uncertain inputs, processed in chunks of `chunk_size` paths.
+
+    `base` holds the fixed scenario inputs; every input named in `distributions`
+    is drawn per path instead. `mean_reversion` maps rates in
+    rate_paths.PATH_INPUTS to (persistence, volatility): each path's value of
+    that rate then becomes the long-run mean of a year-by-year mean-reverting
+    path (see rate_paths.mean_reverting_paths). Only the streaming sketches
+    and counters are kept between chunks, so memory does not grow with `paths`.
+    `periods_per_year` and `capture_rate` (the share of demand served each
+    year) are as for evaluate_scenarios. `rate_paths` holds fixed (1, years)
+    year-by-year paths for rates in rate_paths.PATH_INPUTS; each Monte Carlo
+    path shifts them by its draw's deviation from the base value.
+    """
+    rng = np.random.default_rng(seed)
+    npv_sketch, irr_sketch, payback_sketch = (QuantileSketch(sketch_size) for _ in range(3))
+    negative = irr_undefined = not_paid_back = 0
+
+    for start in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - start)
+        table = {name: np.full(n, float(base.get(name, default))) for name, default in SCENARIO_DEFAULTS.items()}
+        for name, spec in distributions.items():
+            table[name] = draw(spec, n, rng)
+            if name in _NON_NEGATIVE:
+                np.maximum(table[name], 0, out=table[name])
+
+        shifted = {name: np.asarray(path, dtype=float)
+                   + (table[name] - float(base.get(name, SCENARIO_DEFAULTS[name])))[:, np.newaxis]
+                   for name, path in (rate_paths or {}).items()}
+        shifted.update({name: mean_reverting_paths(table[name], years, n, persistence, volatility, seed=rng)
+                        for name, (persistence, volatility) in (mean_reversion or {}).items()})
+        results = evaluate_scenarios(table, years, periods_per_year, capture_rate=capture_rate, rate_paths=shifted)
+        npv_sketch.update(results.npv)
+        irr_sketch.update(results.irr)
+        payback_sketch.update(results.payback)
+        negative += np.count_nonzero(results.npv < 0)
+        irr_undefined += np.count_nonzero(np.isnan(results.irr))
+        not_paid_back += np.count_nonzero(np.isnan(results.payback))
+
+    return SimulationSummary(paths, npv_sketch, irr_sketch, payback_sketch,
+                             negative / paths, irr_undefined / paths, not_paid_back / paths)
+
+
+def percentile_table(summary, percentiles=(10, 50, 90)):
+    """P10/P50/P90 (by default) of NPV, IRR and payback as a DataFrame."""
+    q = np.asarray(percentiles) / 100
+    return pd.DataFrame({
+        "NPV (₦)": summary.npv.quantile(q),
+        "IRR (%)": summary.irr.quantile(q) * 100,
+        "Payback (years)": summary.payback.quantile(q),
+    }, index=[f"P{p}" for p in percentiles])
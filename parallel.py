@@ -0,0 +1,100 @@
+"""Process-pool backend for large scenario sweeps.
+
+Scenario inputs and metric outputs live in shared-memory arrays; workers are
+only sent (start, stop) row ranges, so nothing but two integers is pickled
+per shard.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from scenarios import SCENARIO_DEFAULTS, evaluate_scenarios, scenario_inputs
+
+INPUT_COLUMNS = tuple(SCENARIO_DEFAULTS)
+OUTPUT_COLUMNS = ("npv", "irr", "payback", "profitability_index", "after_tax_npv", "after_tax_irr")
+
+# Per-worker views of the shared buffers, set up by _attach
+_worker = {}
+
+
+def _attach(input_name, output_name, capacity, years):
+    inputs = SharedMemory(name=input_name)
+    outputs = SharedMemory(name=output_name)
+    _worker.update(
+        shm=(inputs, outputs),
+        inputs=np.ndarray((len(INPUT_COLUMNS), capacity), dtype=float, buffer=inputs.buf),
+        outputs=np.ndarray((len(OUTPUT_COLUMNS), capacity), dtype=float, buffer=outputs.buf),
+        years=years,
+    )
+
+
+def _evaluate_shard(bounds):
+    start, stop = bounds
+    inputs, outputs = _worker["inputs"], _worker["outputs"]
+    table = {name: inputs[i, start:stop] for i, name in enumerate(INPUT_COLUMNS)}
+    results = evaluate_scenarios(table, _worker["years"])
+    for i, name in enumerate(OUTPUT_COLUMNS):
+        outputs[i, start:stop] = getattr(results, name)
+    return stop - start
+
+
+class ParallelEvaluator:
+    """Evaluate scenario tables across a pool of worker processes.
+
+    Holds one pool and one pair of shared input/output buffers of `capacity`
+    rows for its lifetime; larger tables are processed in capacity-sized
+    passes. Use as a context manager so the shared memory is released.
+    """
+
+    def __init__(self, years, capacity=1_000_000, workers=None, shard_size=25_000):
+        self.years = years
+        self.capacity = capacity
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self._inputs = SharedMemory(create=True, size=len(INPUT_COLUMNS) * capacity * 8)
+        self._outputs = SharedMemory(create=True, size=len(OUTPUT_COLUMNS) * capacity * 8)
+        self._input_array = np.ndarray((len(INPUT_COLUMNS), capacity), dtype=float, buffer=self._inputs.buf)
+        self._output_array = np.ndarray((len(OUTPUT_COLUMNS), capacity), dtype=float, buffer=self._outputs.buf)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach,
+            initargs=(self._inputs.name, self._outputs.name, capacity, years),
+        )
+
+    def evaluate(self, table):
+        """NPV, IRR, payback, profitability index and after-tax NPV and IRR for every row of `table`, as a DataFrame."""
+        columns = scenario_inputs(table)
+        n = len(columns[INPUT_COLUMNS[0]])
+        output = np.empty((n, len(OUTPUT_COLUMNS)))
+        for offset in range(0, n, self.capacity):
+            rows = min(self.capacity, n - offset)
+            for i, name in enumerate(INPUT_COLUMNS):
+                self._input_array[i, :rows] = columns[name][offset:offset + rows]
+            shards = [(start, min(start + self.shard_size, rows)) for start in range(0, rows, self.shard_size)]
+            for _ in self._pool.map(_evaluate_shard, shards):
+                pass
+            output[offset:offset + rows] = self._output_array[:, :rows].T
+        return pd.DataFrame(output, columns=OUTPUT_COLUMNS)
+
+    def close(self):
+        self._pool.shutdown()
+        del self._input_array, self._output_array
+        for shm in (self._inputs, self._outputs):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def evaluate_parallel(table, years, workers=None, shard_size=25_000):
+    """One-off parallel evaluation of a scenario table; see ParallelEvaluator."""
+    n = len(scenario_inputs(table)[INPUT_COLUMNS[0]])
+    with ParallelEvaluator(years, capacity=max(n, 1), workers=workers, shard_size=shard_size) as evaluator:
+        return evaluator.evaluate(table)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+import metrics
+from scenarios import ScenarioResults, evaluate_scenarios
+
+
+class PortfolioResults(NamedTuple):
+    sites: ScenarioResults
+    cash_flows: np.ndarray
+    npv: float
+    irr: float
+    payback: float
+    profitability_index: float
+
+
+def evaluate_portfolio(sites, years, discount_rate, capture_rate=None, rate_paths=None):
+    """Evaluate every site of a portfolio and consolidate their cash flows.
+
+    `sites` is a scenario table with one row per station (a DataFrame or dict
+    of columns; extra columns such as a site name are ignored). All sites are
+    projected in one batched pass; the consolidated cash flows are their
+    column sums, and portfolio NPV uses `discount_rate` (percent) while each
+    site keeps its own. `capture_rate` may hold one row of yearly shares per site,
+    and `rate_paths` year-by-year rates shared by all sites (see evaluate_scenarios).
+    """
+    if capture_rate is not None:
+        capture_rate = np.asarray(capture_rate, dtype=float)
+    site_results = evaluate_scenarios(sites, years, capture_rate=capture_rate, rate_paths=rate_paths)
+    cash_flows = site_results.cash_flows.sum(axis=0)
+    npv_value = metrics.npv(discount_rate / 100, cash_flows)
+    return PortfolioResults(
+        sites=site_results,
+        cash_flows=cash_flows,
+        npv=float(npv_value),
+        irr=float(metrics.irr(cash_flows)),
+        payback=float(metrics.payback_period(cash_flows)),
+        profitability_index=float(metrics.profitability_index(npv_value, -cash_flows[0])),
+    )
+
+
+def site_frame(results, names=None):
+    """Per-site metrics of a portfolio as a DataFrame, indexed by site name if given."""
+    return pd.DataFrame({
+        "NPV (₦)": results.sites.npv,
+        "IRR (%)": results.sites.irr * 100,
+        "Payback (years)": results.sites.payback,
+        "Profitability Index": results.sites.profitability_index,
+    }, index=pd.Index(names, name="Site") if names is not None else None)
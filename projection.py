@@ -0,0 +1,148 @@
+import numpy as np
+from typing import NamedTuple
+
+# Share of revenue assumed to be spent on energy when no energy-mix model is used
+ENERGY_COST_SHARE = 0.3
+
+
+class Projection(NamedTuple):
+    years: np.ndarray
+    revenue: np.ndarray
+    opex: np.ndarray
+    energy_cost: np.ndarray
+    debt_service: np.ndarray
+    lease_payment: np.ndarray
+    costs: np.ndarray
+    net_cash: np.ndarray
+
+
+def _column(value):
+    # Scalars broadcast over years; arrays of N scenarios become (N, 1) columns
+    return np.asarray(value, dtype=float)[..., np.newaxis]
+
+
+def _compounded(rate, year):
+    # Growth factor for each year from a constant rate, or from a (N, years) path of rates
+    rate = np.asarray(rate, dtype=float)
+    if rate.ndim >= 2:
+        return np.cumprod(1 + rate[..., :len(year)] / 100, axis=-1)
+    return (1 + _column(rate) / 100) ** year
+
+
+def project(revenue_per_year, opex_yearly, revenue_growth, opex_inflation,
+            annual_loan_payment, loan_term, lease_payment, years, capture_rate=1.0,
+            energy_cost_per_year=None, debt_service=None, lease_schedule=None):
+    """Project annual revenue, costs and net cash flow for years 1..years.
+
+    Growth rates are in percent, as entered in the sidebar. Scalar inputs give
+    arrays of shape (years,); array inputs of shape (N,) give (N, years).
+    `revenue_growth` and `opex_inflation` may also be year-by-year paths of
+    shape (N, years) or (1, years) (see rate_paths.py), compounded over the
+    years at the same cost as a constant rate.
+    `capture_rate` scales each year's revenue by the share of demand actually
+    served (a scalar, or an array with years along its last axis).
+    `energy_cost_per_year` is the year-0 energy bill, which grows with the
+    volume sold like revenue; by default it is ENERGY_COST_SHARE of revenue.
+    `debt_service`, e.g. amortization.amortize(...).payment, replaces the level
+    `annual_loan_payment` over `loan_term` when given, and `lease_schedule`
+    (see lease.lease_schedule) the flat `lease_payment`.
+    """
+    year = np.arange(1, years + 1)
+
+    # Apply growth and inflation as compounded factors for every year at once
+    volume = _compounded(revenue_growth, year) * capture_rate
+    revenue = _column(revenue_per_year) * volume
+    opex = _column(opex_yearly) * _compounded(opex_inflation, year)
+
+    if energy_cost_per_year is None:
+        energy_cost = revenue * ENERGY_COST_SHARE
+    else:
+        energy_cost = _column(energy_cost_per_year) * volume
+
+    # Loan payment drops off after loan term
+    if debt_service is None:
+        debt_service = np.where(year <= _column(loan_term), _column(annual_loan_payment), 0.0)
+    debt_service = np.broadcast_to(debt_service, revenue.shape)
+    lease = np.broadcast_to(_column(lease_payment) if lease_schedule is None else lease_schedule, revenue.shape)
+
+    costs = opex + energy_cost + debt_service + lease
+    net_cash = revenue - costs
+
+    return Projection(year, revenue, opex, energy_cost, debt_service, lease, costs, net_cash)
+
+
+def cash_flow_series(capex, net_cash):
+    """Prepend the year-0 investment to the annual net cash flows."""
+    initial = -np.broadcast_to(_column(capex), net_cash.shape[:-1] + (1,))
+    return np.concatenate([initial, net_cash], axis=-1)
+
+
+def project_periods(revenue_per_year, opex_yearly, revenue_growth, opex_inflation,
+                    period_loan_payment, loan_term, lease_payment, years, periods_per_year=12,
+                    capture_rate=1.0, energy_cost_per_year=None, debt_service=None, lease_schedule=None):
+    """Project at sub-annual resolution (12 = monthly, 365 = daily).
+
+    Growth and inflation step once a year as in `project`, and each year's
+    totals are spread evenly over its periods, while the loan is repaid with
+    `period_loan_payment` for loan_term * periods_per_year periods (or as the
+    per-period `debt_service` schedule). Arrays have years * periods_per_year
+    entries along the last axis.
+    """
+    annual = project(revenue_per_year, opex_yearly, revenue_growth, opex_inflation,
+                     0.0, loan_term, lease_payment, years, capture_rate, energy_cost_per_year,
+                     lease_schedule=lease_schedule)
+    shape = annual.revenue.shape + (periods_per_year,)
+    periods = years * periods_per_year
+
+    def spread(values):
+        return np.broadcast_to(values[..., np.newaxis] / periods_per_year, shape).reshape(shape[:-2] + (periods,))
+
+    period = np.arange(1, periods + 1)
+    if debt_service is None:
+        debt_service = np.where(period <= _column(loan_term) * periods_per_year, _column(period_loan_payment), 0.0)
+    revenue, opex, energy_cost, lease = (spread(x) for x in (annual.revenue, annual.opex, annual.energy_cost, annual.lease_payment))
+    debt_service = np.broadcast_to(debt_service, revenue.shape)
+
+    costs = opex + energy_cost + debt_service + lease
+    net_cash = revenue - costs
+
+    return Projection(period, revenue, opex, energy_cost, debt_service, lease, costs, net_cash)
+
+
+def aggregate(projection, periods_per_year):
+    """Sum a sub-annual projection into annual totals, one year per row of the reshaped arrays."""
+    years = len(projection.years) // periods_per_year
+
+    def total(values):
+        return values.reshape(values.shape[:-1] + (years, periods_per_year)).sum(axis=-1)
+
+    return Projection(np.arange(1, years + 1), *(total(x) for x in projection[1:]))
+
+
+def _geometric_sum(q, n):
+    # Sum of q ** t for t = 1..n, taking the limit n where q == 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(np.abs(q - 1) < 1e-12, n, q * (1 - q ** n) / (1 - q))
+
+
+def npv_closed_form(capex, revenue_per_year, opex_yearly, revenue_growth, opex_inflation,
+                    annual_loan_payment, loan_term, lease_payment, years, discount_rate,
+                    energy_cost_per_year=None):
+    """NPV of cash_flow_series(capex, project(...).net_cash) without building the projection.
+
+    With constant growth every stream is a geometric series, so the cost per
+    scenario does not depend on `years`. Debt service is an annuity truncated
+    at the loan term (none without a term). Rates are in percent.
+    """
+    if energy_cost_per_year is None:
+        energy_cost_per_year = revenue_per_year * ENERGY_COST_SHARE
+    d = 1 / (1 + np.asarray(discount_rate, dtype=float) / 100)
+    revenue_factor = (1 + np.asarray(revenue_growth, dtype=float) / 100) * d
+    opex_factor = (1 + np.asarray(opex_inflation, dtype=float) / 100) * d
+    loan_years = np.clip(np.floor(loan_term), 0, years)
+
+    return (-np.asarray(capex, dtype=float)
+            + (revenue_per_year - energy_cost_per_year) * _geometric_sum(revenue_factor, years)
+            - opex_yearly * _geometric_sum(opex_factor, years)
+            - np.where(loan_years > 0, annual_loan_payment * _geometric_sum(d, loan_years), 0.0)
+            - lease_payment * _geometric_sum(d, years))
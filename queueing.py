@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from utilization import LAGOS_HOURLY_PROFILE, demand_index
+
+
+def erlang_b(offered_load, max_servers):
+    """Erlang B blocking probability for 1..max_servers servers.
+
+    Uses the stable recursion B(c) = a B(c-1) / (c + a B(c-1)). `offered_load`
+    (in Erlangs) may be an array; the result has a trailing axis of length
+    max_servers.
+    """
+    a = np.asarray(offered_load, dtype=float)
+    blocking = np.empty(a.shape + (max_servers,))
+    b = np.ones_like(a)
+    for c in range(1, max_servers + 1):
+        b = a * b / (c + a * b)
+        blocking[..., c - 1] = b
+    return blocking
+
+
+def erlang_c(offered_load, max_servers):
+    """Erlang C probability of waiting for 1..max_servers servers (1 where c <= load)."""
+    a = np.asarray(offered_load, dtype=float)[..., np.newaxis]
+    c = np.arange(1, max_servers + 1)
+    b = erlang_b(offered_load, max_servers)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wait = c * b / (c - a * (1 - b))
+    return np.where(c > a, wait, 1.0)
+
+
+def erlang_capture_rate(sessions_per_day, charging_time, chargers, years=1, demand_growth=0.0,
+                        profile=LAGOS_HOURLY_PROFILE):
+    """Share of demand served each year by `chargers` with no queue, from Erlang B.
+
+    Each hour of the day is taken as a steady-state loss system at that hour's
+    arrival rate, sessions_per_day * profile[hour] growing by `demand_growth`
+    percent a year (a constant or a year-by-year path); blocking does not
+    depend on the charging-time distribution. It ignores sessions carried over
+    from busier hours, so it is a fast approximation of
+    utilization.simulate_utilization(...).capture_rate for sweeps over many
+    sites or charger counts. Inputs broadcast as for simulate_utilization; the
+    result has shape (..., years).
+    """
+    sessions_per_day = np.asarray(sessions_per_day, dtype=float)[..., np.newaxis, np.newaxis]
+    charging_time = np.asarray(charging_time, dtype=float)[..., np.newaxis, np.newaxis]
+    chargers = np.asarray(chargers, dtype=int)[..., np.newaxis, np.newaxis]
+
+    profile = np.asarray(profile, dtype=float)[..., np.newaxis, :]
+    hourly = sessions_per_day * demand_index(demand_growth, years) * profile
+    offered_load = np.broadcast_to(hourly * charging_time / 60, np.broadcast_shapes(hourly.shape, chargers.shape))
+    blocking = erlang_b(offered_load, max(int(np.max(chargers)), 1))
+    blocking = np.where(chargers > 0, np.take_along_axis(blocking, np.maximum(chargers - 1, 0)[..., np.newaxis],
+                                                         axis=-1)[..., 0], 1.0)
+    demand = np.broadcast_to(hourly, blocking.shape).sum(axis=-1)
+    with np.errstate(invalid="ignore"):
+        return np.where(demand > 0, (hourly * (1 - blocking)).sum(axis=-1) / demand, 1.0)
+
+
+def capacity_table(sessions_per_day, charging_time, max_chargers=100, profile=LAGOS_HOURLY_PROFILE):
+    """M/M/c capacity-planning metrics for 1..max_chargers chargers at the peak hour.
+
+    Arrivals are Poisson at the peak-hour rate sessions_per_day * max(profile)
+    and charging times exponential with mean `charging_time` minutes. Drivers
+    either queue (Erlang C: wait probability and mean wait) or, if they will
+    not wait, leave when every charger is busy (Erlang B: lost sessions).
+    """
+    arrival_rate = sessions_per_day * np.max(profile) / 60  # per minute
+    offered_load = arrival_rate * charging_time
+    chargers = np.arange(1, max_chargers + 1)
+
+    wait_probability = erlang_c(offered_load, max_chargers)
+    with np.errstate(divide="ignore"):
+        mean_wait = np.where(chargers > offered_load,
+                             wait_probability * charging_time / (chargers - offered_load), np.inf)
+    blocking = erlang_b(offered_load, max_chargers)
+
+    return pd.DataFrame({
+        "Utilization": np.minimum(offered_load / chargers, 1.0),
+        "Wait Probability": wait_probability,
+        "Mean Wait (mins)": mean_wait,
+        "Lost Sessions per Peak Hour": blocking * arrival_rate * 60,
+    }, index=pd.Index(chargers, name="Chargers"))
@@ -0,0 +1,28 @@
+import numpy as np
+from scipy.signal import lfilter
+
+# Scenario inputs that can follow a year-by-year path instead of a constant rate (all percent)
+PATH_INPUTS = ("revenue_growth", "opex_inflation", "interest_rate")
+
+
+def mean_reverting_paths(mean, years, paths=1, persistence=0.6, volatility=2.0, start=None, seed=None):
+    """Year-by-year rates (percent) from a mean-reverting AR(1) process, shape (paths, years).
+
+    Each year's rate is mean + persistence * (last year's rate - mean) plus a
+    normal shock with standard deviation `volatility` percentage points,
+    starting from `start` (default: the mean). `mean` and `start` may be
+    arrays of length `paths`, e.g. one long-run mean per Monte Carlo path. The
+    recursion runs as a linear filter over all paths at once.
+    """
+    mean = np.broadcast_to(np.asarray(mean, dtype=float), (paths,))[:, np.newaxis]
+    start = mean if start is None else np.broadcast_to(np.asarray(start, dtype=float), (paths,))[:, np.newaxis]
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((paths, years)) * volatility
+    deviation, _ = lfilter([1.0], [1.0, -persistence], shocks, axis=-1, zi=persistence * (start - mean))
+    return mean + deviation
+
+
+def path_matrix(values, years):
+    """A (1, years) path from year-by-year values, holding the last value beyond the ones given."""
+    values = np.asarray(values, dtype=float)
+    return np.concatenate([values[:years], np.full(max(years - len(values), 0), values[-1])])[np.newaxis, :]
@@ -0,0 +1,241 @@
+import numpy as np
+import numpy_financial as npf
+import pandas as pd
+from typing import NamedTuple
+
+from amortization import amortize, annual_schedule, whole_years
+from lease import lease_present_value, lease_schedule
+from lifecycle import apply_lifecycle
+from metrics import discount_factors, irr, npv, payback_period, profitability_index
+from projection import ENERGY_COST_SHARE, aggregate, cash_flow_series, npv_closed_form, project, project_periods
+from rate_paths import PATH_INPUTS
+from tax import after_tax_cash_flows
+
+# Scenario table columns and the sidebar defaults used when a column is missing
+SCENARIO_DEFAULTS = {
+    "sessions_per_day": 50,
+    "avg_kwh_per_session": 20,
+    "price_per_kwh": 300,
+    "capex": 15_000_000,
+    "opex_monthly": 500_000,
+    "opex_inflation": 5.0,
+    "revenue_growth": 3.0,
+    "loan_pct": 50,
+    "loan_term": 5,
+    "interest_rate": 10.0,
+    # Lease terms (see lease.py); with lease = 1 there is no upfront capex or loan
+    "lease": 0,
+    "lease_rate": 15.0,
+    "lease_term": np.nan,
+    "lease_escalation": 0.0,
+    "lease_buyout_pct": 0.0,
+    "discount_rate": 10.0,
+    # Loan structure (see amortization.py); refinance_year 0 means no refinancing and
+    # NaN refinance rate/term keep the original rate and remaining term
+    "grace_years": 0,
+    "balloon_pct": 0.0,
+    "refinance_year": 0,
+    "refinance_rate": np.nan,
+    "refinance_term": np.nan,
+    # Capital allowances for tax (see tax.py); declining_rate 0 means straight line over allowance_life
+    "allowance_life": 5,
+    "declining_rate": 0.0,
+    # 1 adds equipment replacement, degradation and salvage (see lifecycle.py)
+    "lifecycle": 0,
+    # Energy cost per kWh delivered (see dispatch.py); NaN uses ENERGY_COST_SHARE of revenue
+    "energy_cost_per_kwh": np.nan,
+}
+
+
+class ScenarioResults(NamedTuple):
+    cash_flows: np.ndarray
+    npv: np.ndarray
+    irr: np.ndarray
+    payback: np.ndarray
+    profitability_index: np.ndarray
+    after_tax_npv: np.ndarray
+    after_tax_irr: np.ndarray
+
+
+def scenario_inputs(table):
+    """Return one float array per scenario column, filling missing columns with defaults.
+
+    `table` may be a DataFrame, a dict of columns or a single dict of scalars.
+    Loan terms are rounded to whole years (see amortization.whole_years).
+    """
+    columns = {name: np.asarray(table[name], dtype=float) for name in SCENARIO_DEFAULTS if name in table}
+    n = max((np.size(v) for v in columns.values()), default=1)
+    for name, default in SCENARIO_DEFAULTS.items():
+        columns[name] = np.broadcast_to(columns.get(name, default), (n,)).astype(float)
+    columns["loan_term"] = whole_years(columns["loan_term"])
+    return columns
+
+
+def _upfront_capex(p):
+    # Leased equipment needs no purchase, and so no loan
+    return np.where(p["lease"] > 0, 0.0, p["capex"])
+
+
+def _loan_amount(p):
+    # The loan funds loan_pct of the purchase (nothing without a term); the rest is equity paid in year 0
+    return np.where(p["loan_term"] > 0, _upfront_capex(p) * p["loan_pct"] / 100, 0.0)
+
+
+def _base_streams(p, periods_per_year=1):
+    # Year-0 revenue and opex, loan payment per period and year-0 energy cost per scenario
+    kwh_per_year = p["sessions_per_day"] * 365 * p["avg_kwh_per_session"]
+    revenue_per_year = kwh_per_year * p["price_per_kwh"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        loan_payment = npf.pmt(p["interest_rate"] / 100 / periods_per_year, p["loan_term"] * periods_per_year, -_loan_amount(p))
+    energy_cost_per_year = np.where(np.isnan(p["energy_cost_per_kwh"]), revenue_per_year * ENERGY_COST_SHARE,
+                                    kwh_per_year * p["energy_cost_per_kwh"])
+    return revenue_per_year, p["opex_monthly"] * 12, loan_payment, energy_cost_per_year
+
+
+def scenario_lease_schedule(p, years):
+    """Annual lease payments of each scenario (zero where the equipment is bought)."""
+    return lease_schedule(p["capex"], years, p["lease_rate"], p["lease_term"], p["lease_escalation"],
+                          p["lease_buyout_pct"]) * (p["lease"] > 0)[:, np.newaxis]
+
+
+def loan_schedule(p, periods, periods_per_year=1, interest_rate=None):
+    """Amortization schedule of each scenario's loan over the first `periods` periods.
+
+    `interest_rate` optionally replaces the scenario's fixed rate with a
+    floating (N, years) or (1, years) path of annual rates, one per year.
+    """
+    if interest_rate is None:
+        interest_rate = p["interest_rate"]
+    elif np.ndim(interest_rate) >= 2:
+        interest_rate = np.repeat(interest_rate, periods_per_year, axis=-1)
+    return amortize(_loan_amount(p), interest_rate, p["loan_term"], periods, periods_per_year,
+                    p["grace_years"] * periods_per_year, p["balloon_pct"], p["refinance_year"] * periods_per_year,
+                    p["refinance_rate"], p["refinance_term"])
+
+
+def _plain_loans(p):
+    # Level-payment loans whose debt service the closed-form NPV can price as an annuity
+    return not (np.any(p["grace_years"] > 0) or np.any(p["balloon_pct"] > 0) or np.any(p["refinance_year"] > 0))
+
+
+def evaluate_scenarios(table, years, periods_per_year=1, capture_rate=None, rate_paths=None):
+    """Evaluate every scenario row in one broadcasted pass.
+
+    Returns an (N, years + 1) cash-flow matrix (year 0 first) and NPV, IRR,
+    payback and profitability-index vectors of length N, plus NPV and IRR
+    after company income and tertiary education tax. Cash flows are the
+    equity holder's: year 0 carries the purchase less the loan, which is
+    then repaid through the debt service. With
+    `periods_per_year` > 1 the loan is amortized per period and the periodic
+    projection is summed back to annual cash flows. `capture_rate` is the
+    share of demand served each year, e.g. from utilization.simulate_utilization.
+    `rate_paths` maps any of rate_paths.PATH_INPUTS to a (N, years) or
+    (1, years) matrix of year-by-year rates replacing that column, so
+    path-dependent runs go through the same broadcasted pass.
+    """
+    capture_rate = 1.0 if capture_rate is None else np.asarray(capture_rate, dtype=float)
+    p = scenario_inputs(table)
+    rates = {name: p[name] for name in PATH_INPUTS}
+    rates.update(rate_paths or {})
+    revenue_per_year, opex_yearly, loan_payment, energy_cost_per_year = _base_streams(p, periods_per_year)
+    schedule = loan_schedule(p, years * periods_per_year, periods_per_year, rates["interest_rate"])
+    debt_service = schedule.payment
+    leases = scenario_lease_schedule(p, years)
+
+    if periods_per_year == 1:
+        projection = project(revenue_per_year, opex_yearly, rates["revenue_growth"], rates["opex_inflation"],
+                             loan_payment, p["loan_term"], 0.0, years, capture_rate, energy_cost_per_year,
+                             debt_service, leases)
+    else:
+        projection = aggregate(project_periods(revenue_per_year, opex_yearly, rates["revenue_growth"], rates["opex_inflation"],
+                                               loan_payment, p["loan_term"], 0.0, years, periods_per_year,
+                                               capture_rate, energy_cost_per_year, debt_service, leases),
+                               periods_per_year)
+    upfront = _upfront_capex(p)
+    cycle = None
+    if np.any(p["lifecycle"] > 0):
+        projection, cycle = apply_lifecycle(projection, upfront * (p["lifecycle"] > 0))
+    cash_flows = cash_flow_series(upfront - _loan_amount(p), projection.net_cash)
+    interest = annual_schedule(schedule, periods_per_year).interest
+    _, after_tax = after_tax_cash_flows(projection, interest, upfront, p["allowance_life"], p["declining_rate"],
+                                        _loan_amount(p), cycle)
+
+    npv_value = npv(p["discount_rate"] / 100, cash_flows)
+    return ScenarioResults(
+        cash_flows=cash_flows,
+        npv=npv_value,
+        irr=irr(cash_flows),
+        payback=payback_period(cash_flows),
+        profitability_index=profitability_index(npv_value, upfront - _loan_amount(p)),
+        after_tax_npv=npv(p["discount_rate"] / 100, after_tax),
+        after_tax_irr=irr(after_tax),
+    )
+
+
+def npv_scenarios(table, years, periods_per_year=1, capture_rate=None, rate_paths=None):
+    """NPV of every scenario row, without building the cash-flow matrix when possible.
+
+    With constant growth and inflation and no `capture_rate` the analytic
+    annuity form applies and the cost per row is independent of `years`; a
+    sub-annual `periods_per_year`, per-year capture rate, year-by-year
+    `rate_paths` or equipment lifecycle falls back to evaluate_scenarios. Grace periods,
+    balloons or refinancing add the discounted amortization schedule instead
+    of the loan annuity. Use this when only NPV is needed, e.g. for large
+    screening sweeps.
+    """
+    p = scenario_inputs(table)
+    if periods_per_year > 1 or capture_rate is not None or rate_paths or np.any(p["lifecycle"] > 0):
+        return evaluate_scenarios(p, years, periods_per_year, capture_rate=capture_rate, rate_paths=rate_paths).npv
+    revenue_per_year, opex_yearly, annual_loan_payment, energy_cost_per_year = _base_streams(p)
+    equity = _upfront_capex(p) - _loan_amount(p)
+    lease_pv = np.where(p["lease"] > 0, lease_present_value(p["capex"], years, p["discount_rate"], p["lease_rate"],
+                                                            p["lease_term"], p["lease_escalation"],
+                                                            p["lease_buyout_pct"]), 0.0)
+    if _plain_loans(p):
+        return npv_closed_form(equity, revenue_per_year, opex_yearly, p["revenue_growth"], p["opex_inflation"],
+                               annual_loan_payment, p["loan_term"], 0.0, years, p["discount_rate"],
+                               energy_cost_per_year) - lease_pv
+    debt_pv = (loan_schedule(p, years).payment * discount_factors(p["discount_rate"] / 100, years + 1)[..., 1:]).sum(axis=-1)
+    return npv_closed_form(equity, revenue_per_year, opex_yearly, p["revenue_growth"], p["opex_inflation"],
+                           0.0, p["loan_term"], 0.0, years, p["discount_rate"],
+                           energy_cost_per_year) - debt_pv - lease_pv
+
+
+def compare_lease_buy(table, years, periods_per_year=1, capture_rate=None, rate_paths=None):
+    """Buy and lease versions of every scenario row, evaluated side by side in one batch.
+
+    Returns a DataFrame with both NPVs (pre- and after-tax), the NPV advantage
+    of buying and the crossover discount rate: the IRR of the buy-minus-lease
+    cash flows, below which buying has the higher NPV when buying costs more
+    upfront. It is NaN where the two never cross. `periods_per_year`,
+    `capture_rate` and `rate_paths` are as for evaluate_scenarios.
+    """
+    p = scenario_inputs(table)
+    n = len(p["capex"])
+    both = {name: np.concatenate([column, column]) for name, column in p.items()}
+    both["lease"] = np.repeat([0.0, 1.0], n)
+    if np.ndim(capture_rate) == 2:
+        capture_rate = np.concatenate([capture_rate, capture_rate])
+    rate_paths = {name: np.concatenate([path, path]) if len(path) > 1 else path
+                  for name, path in (rate_paths or {}).items()}
+    results = evaluate_scenarios(both, years, periods_per_year, capture_rate=capture_rate, rate_paths=rate_paths)
+    buy, lease = slice(0, n), slice(n, 2 * n)
+    return pd.DataFrame({
+        "buy_npv": results.npv[buy],
+        "lease_npv": results.npv[lease],
+        "npv_difference": results.npv[buy] - results.npv[lease],
+        "after_tax_npv_difference": results.after_tax_npv[buy] - results.after_tax_npv[lease],
+        "crossover_rate": irr(results.cash_flows[buy] - results.cash_flows[lease]),
+    })
+
+
+def results_frame(results):
+    """Per-scenario metrics as a DataFrame."""
+    return pd.DataFrame({
+        "npv": results.npv,
+        "irr": results.irr,
+        "payback": results.payback,
+        "profitability_index": results.profitability_index,
+        "after_tax_npv": results.after_tax_npv,
+        "after_tax_irr": results.after_tax_irr,
+    })
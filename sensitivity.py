@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from scenarios import SCENARIO_DEFAULTS, evaluate_scenarios, npv_scenarios
+
+
+def sensitivity_grid(base, x_name, x_values, y_name, y_values, years, periods_per_year=1, capture_rate=None,
+                     rate_paths=None):
+    """NPV and IRR over every (x, y) pair of two inputs, other inputs held at `base`.
+
+    All len(y_values) * len(x_values) scenarios are evaluated in one batched
+    call. `periods_per_year`, `capture_rate` and `rate_paths` are as for
+    evaluate_scenarios; an
+    input on either axis is held constant at its grid value instead of
+    following its path. Returns (npv, irr) arrays of shape
+    (len(y_values), len(x_values)).
+    """
+    x_grid, y_grid = np.meshgrid(np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float))
+    table = {name: base.get(name, default) for name, default in SCENARIO_DEFAULTS.items()}
+    table[x_name] = x_grid.ravel()
+    table[y_name] = y_grid.ravel()
+    rate_paths = {name: path for name, path in (rate_paths or {}).items() if name not in (x_name, y_name)}
+    results = evaluate_scenarios(table, years, periods_per_year, capture_rate=capture_rate, rate_paths=rate_paths)
+    return results.npv.reshape(x_grid.shape), results.irr.reshape(x_grid.shape)
+
+
+def tornado(base, names, pct, years, periods_per_year=1, capture_rate=None, rate_paths=None):
+    """NPV swing of each input moved down and up by `pct` percent, one at a time.
+
+    The base case and all 2 * len(names) perturbed scenarios are evaluated in
+    one batched call at `periods_per_year` resolution, serving `capture_rate`
+    of demand each year (as for evaluate_scenarios). An input following one of `rate_paths` has its
+    whole path scaled by the same factor. Returns (frame, base_npv): a DataFrame indexed by input
+    name with the low and high NPVs and their swing, sorted from largest to
+    smallest swing, and the unperturbed NPV.
+    """
+    k = len(names)
+    table = {name: np.full(2 * k + 1, float(base.get(name, default))) for name, default in SCENARIO_DEFAULTS.items()}
+    paths = {name: np.repeat(np.asarray(path, dtype=float), 2 * k + 1, axis=0) for name, path in (rate_paths or {}).items()}
+    for i, name in enumerate(names):
+        column = paths[name].T if name in paths else table[name]
+        column[..., 2 * i] *= 1 - pct / 100
+        column[..., 2 * i + 1] *= 1 + pct / 100
+    npv = npv_scenarios(table, years, periods_per_year, capture_rate=capture_rate, rate_paths=paths or None)
+    low, high, base_npv = npv[0:2 * k:2], npv[1:2 * k:2], npv[-1]
+    frame = pd.DataFrame({"low": low, "high": high, "swing": np.abs(high - low)}, index=list(names))
+    return frame.sort_values("swing", ascending=False), float(base_npv)
@@ -0,0 +1,81 @@
+"""Time-of-use tariffs priced on an hour-of-week lookup.
+
+A tariff becomes a 168-entry price vector, and hourly kWh are folded into
+the same 168 hours, so the revenue of many designs over many sites is a
+single matrix product.
+"""
+import numpy as np
+from typing import NamedTuple
+
+from utilization import HOURS_PER_YEAR
+
+HOURS_PER_WEEK = 168
+
+
+class Tariff(NamedTuple):
+    """One tariff design; premiums, discounts and the member share are in percent.
+
+    Hour bands are [start, end) hours of the day and may wrap past midnight.
+    Weekend and membership discounts apply on top of the peak/off-peak price.
+    No hour's list price exceeds `price_cap` (e.g. a site's regulated tariff cap).
+    """
+    base_price: float
+    peak_hours: tuple = (17, 21)
+    peak_premium: float = 0.0
+    off_peak_hours: tuple = (22, 6)
+    off_peak_discount: float = 0.0
+    weekend_discount: float = 0.0
+    member_discount: float = 0.0
+    member_share: float = 0.0
+    price_cap: float = np.inf
+
+
+def _in_band(hour, band):
+    start, end = np.asarray(band, dtype=float).T[..., np.newaxis]
+    return np.where(start <= end, (hour >= start) & (hour < end), (hour >= start) | (hour < end))
+
+
+def hour_of_week_prices(tariffs):
+    """Price per kWh in each of the 168 hours of the week (Monday 00:00 first), one row per tariff."""
+    columns = {field: np.array([getattr(t, field) for t in tariffs], dtype=float)[:, np.newaxis]
+               for field in Tariff._fields}
+    how = np.arange(HOURS_PER_WEEK)
+    hour, weekend = how % 24, how // 24 >= 5
+
+    peak = _in_band(hour, [t.peak_hours for t in tariffs])
+    off_peak = _in_band(hour, [t.off_peak_hours for t in tariffs]) & ~peak
+    prices = columns["base_price"] * np.where(peak, 1 + columns["peak_premium"] / 100,
+                                              np.where(off_peak, 1 - columns["off_peak_discount"] / 100, 1.0))
+    prices = np.minimum(prices * np.where(weekend, 1 - columns["weekend_discount"] / 100, 1.0), columns["price_cap"])
+    return prices * (1 - columns["member_share"] / 100 * columns["member_discount"] / 100)
+
+
+def weekly_profile(hourly_kwh, start_weekday=0):
+    """Sum an hourly series (hours along the last axis) into its 168 hours of the week.
+
+    `start_weekday` is the weekday of the first hour (0 = Monday).
+    """
+    hourly_kwh = np.asarray(hourly_kwh, dtype=float)
+    hours = hourly_kwh.shape[-1]
+    how = (np.arange(hours) + 24 * start_weekday) % HOURS_PER_WEEK
+    rows = hourly_kwh.reshape(-1, hours)
+    index = how + HOURS_PER_WEEK * np.arange(len(rows))[:, np.newaxis]
+    totals = np.bincount(index.ravel(), rows.ravel(), len(rows) * HOURS_PER_WEEK)
+    return totals.reshape(hourly_kwh.shape[:-1] + (HOURS_PER_WEEK,))
+
+
+def tariff_revenue(tariffs, hourly_kwh, start_weekday=0):
+    """Annual revenue of each tariff (rows) for each hourly kWh series, via one hour-of-week product."""
+    return hour_of_week_prices(tariffs) @ weekly_profile(hourly_kwh, start_weekday).T
+
+
+def effective_price(tariffs, hourly_kwh, start_weekday=0):
+    """Average price per kWh actually billed under each tariff."""
+    kwh = np.asarray(hourly_kwh, dtype=float).sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return tariff_revenue(tariffs, hourly_kwh, start_weekday) / kwh
+
+
+def hourly_energy_sold(hourly_sessions, avg_kwh_per_session):
+    """kWh billed in each hour, attributing each session's energy to its start hour."""
+    return np.asarray(hourly_sessions, dtype=float)[..., :HOURS_PER_YEAR] * avg_kwh_per_session
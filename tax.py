@@ -0,0 +1,87 @@
+import numpy as np
+from typing import NamedTuple
+
+from projection import cash_flow_series
+
+# Nigerian company income tax by annual turnover (Finance Act 2019): small companies
+# (up to ₦25m) pay nothing, medium companies (up to ₦100m) 20% and large companies 30%
+CIT_BANDS = ((25_000_000, 0.0), (100_000_000, 20.0), (np.inf, 30.0))
+
+# Tertiary education tax on assessable profit, percent; small companies are exempt
+TERTIARY_EDUCATION_TAX = 3.0
+
+
+class TaxResult(NamedTuple):
+    allowances: np.ndarray
+    taxable_profit: np.ndarray
+    assessable_profit: np.ndarray
+    company_income_tax: np.ndarray
+    tertiary_education_tax: np.ndarray
+    tax: np.ndarray
+
+
+def _column(value):
+    return np.asarray(value, dtype=float)[..., np.newaxis]
+
+
+def capital_allowances(capex, years, life=5, declining_rate=0.0):
+    """Capital allowances on `capex` claimed in years 1..years.
+
+    With `declining_rate` 0 the cost is written off in equal parts over
+    `life` years; otherwise declining_rate percent of the written-down value
+    is claimed each year and the remainder in year `life`.
+    """
+    capex, life, rate = _column(capex), _column(life), _column(declining_rate) / 100
+    year = np.arange(1, years + 1)
+    written_down = capex * (1 - rate) ** (year - 1)
+    declining = np.where(year < life, written_down * rate, np.where(year == life, written_down, 0.0))
+    straight = np.where(year <= life, capex / life, 0.0)
+    return np.where(rate > 0, declining, straight)
+
+
+def cit_rate(turnover):
+    """Company income tax rate in percent for each year's turnover."""
+    limits = np.array([limit for limit, _ in CIT_BANDS])
+    rates = np.array([rate for _, rate in CIT_BANDS])
+    return rates[np.searchsorted(limits, turnover, side="left")]
+
+
+def company_tax(revenue, deductible_costs, interest, allowances):
+    """Company income tax and tertiary education tax for years along the last axis.
+
+    Taxable profit is revenue less deductible operating costs, loan interest
+    and capital allowances. Losses are carried forward without limit: tax is
+    assessed on each year's rise in the running maximum of cumulative profit
+    (floored at zero), so no loop over years is needed.
+    """
+    taxable = revenue - deductible_costs - interest - allowances
+    peak = np.maximum.accumulate(np.maximum(np.cumsum(taxable, axis=-1), 0.0), axis=-1)
+    assessable = np.diff(peak, axis=-1, prepend=0.0)
+
+    cit = assessable * cit_rate(revenue) / 100
+    tet = np.where(revenue > CIT_BANDS[0][0], assessable * TERTIARY_EDUCATION_TAX / 100, 0.0)
+    return TaxResult(np.broadcast_to(allowances, taxable.shape), taxable, assessable, cit, tet, cit + tet)
+
+
+def after_tax_cash_flows(projection, interest, capex, life=5, declining_rate=0.0, loan=0.0, cycle=None):
+    """Tax on an annual projection and its after-tax cash flows (year 0 first).
+
+    Operating costs, energy and lease payments are deductible; `interest` is
+    the annual loan interest (see amortization.py). Allowances are claimed on
+    the whole `capex`, while year 0 carries only the part not funded by `loan`.
+    With the Lifecycle arrays of lifecycle.apply_lifecycle as `cycle`, each
+    year's replacement spending earns its own allowances from the next year,
+    as capex does from year 1, and salvage is taxed as a balancing charge
+    (netted against the allowances).
+    """
+    years = len(projection.years)
+    allowances = capital_allowances(capex, years, life, declining_rate)
+    if cycle is not None:
+        spent = cycle.replacement.reshape(-1, years).any(axis=0)
+        for year in np.flatnonzero(spent) + 1:
+            claims = capital_allowances(cycle.replacement[..., year - 1], years - year, life, declining_rate)
+            allowances = allowances + np.concatenate([np.zeros(claims.shape[:-1] + (year,)), claims], axis=-1)
+        allowances = allowances - cycle.salvage
+    deductible = projection.opex + projection.energy_cost + projection.lease_payment
+    result = company_tax(projection.revenue, deductible, interest, allowances)
+    return result, cash_flow_series(np.asarray(capex) - loan, projection.net_cash - result.tax)
@@ -0,0 +1,35 @@
+import numpy as np
+import numpy_financial as npf
+
+from amortization import amortize
+
+PRINCIPAL, RATE, TERM = 1_000_000.0, 12.0, 5
+
+
+def test_level_payments_match_numpy_financial():
+    schedule = amortize(PRINCIPAL, RATE, TERM, periods_per_year=12)
+    np.testing.assert_allclose(schedule.payment, npf.pmt(RATE / 1200, TERM * 12, -PRINCIPAL), rtol=1e-10)
+    np.testing.assert_allclose(schedule.balance[..., -1], 0.0, atol=1e-6)
+
+
+def test_grace_period_pays_interest_then_amortizes_the_rest():
+    schedule = amortize(PRINCIPAL, RATE, TERM, grace_periods=2)
+    np.testing.assert_allclose(schedule.payment[..., :2], PRINCIPAL * RATE / 100, rtol=1e-10)
+    np.testing.assert_allclose(schedule.payment[..., 2:], npf.pmt(RATE / 100, TERM - 2, -PRINCIPAL), rtol=1e-10)
+
+
+def test_balloon_is_due_with_the_last_payment():
+    balloon = PRINCIPAL * 0.3
+    schedule = amortize(PRINCIPAL, RATE, TERM, balloon_pct=30.0)
+    level = npf.pmt(RATE / 100, TERM, -PRINCIPAL, balloon)
+    np.testing.assert_allclose(schedule.payment[..., :-1], level, rtol=1e-10)
+    np.testing.assert_allclose(schedule.payment[..., -1], level + balloon, rtol=1e-10)
+
+
+def test_refinancing_reamortizes_the_outstanding_balance():
+    schedule = amortize(PRINCIPAL, RATE, TERM, refinance_period=2, refinance_rate=6.0, refinance_term=4)
+    level = npf.pmt(RATE / 100, TERM, -PRINCIPAL)
+    owed = npf.fv(RATE / 100, 2, level, -PRINCIPAL)
+    np.testing.assert_allclose(schedule.balance[..., 1], owed, rtol=1e-10)
+    np.testing.assert_allclose(schedule.payment[..., 2:], npf.pmt(0.06, 4, -owed), rtol=1e-10)
+    assert schedule.payment.shape[-1] == 6
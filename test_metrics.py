@@ -0,0 +1,32 @@
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+from metrics import _BRACKET_GRID, solve_irr
+
+
+def reference_irr(rows):
+    # npf.irr, limited to the range of rates solve_irr brackets
+    rates = np.array([npf.irr(row) for row in rows])
+    lowest, highest = 1 / _BRACKET_GRID[-1] - 1, 1 / _BRACKET_GRID[0] - 1
+    return np.where((rates > lowest) & (rates < highest), rates, np.nan)
+
+
+@pytest.mark.parametrize("rows", [
+    # Non-conventional rows with any number of sign changes
+    np.random.default_rng(0).normal(size=(3000, 11)),
+    np.random.default_rng(1).normal(size=(2000, 4)),
+    # Conventional investments: an outlay followed by mostly positive returns
+    np.column_stack([-np.random.default_rng(2).uniform(1, 10, 3000),
+                     np.random.default_rng(3).normal(1, 2, (3000, 10))]),
+])
+def test_solve_irr_matches_numpy_financial(rows):
+    rate, converged = solve_irr(rows)
+    expected = reference_irr(rows)
+    np.testing.assert_array_equal(np.isnan(rate), np.isnan(expected))
+    np.testing.assert_allclose(rate[converged], expected[converged], rtol=1e-8, atol=1e-10)
+
+
+def test_solve_irr_of_zero_rows_is_nan():
+    rate, converged = solve_irr(np.zeros((3, 11)))
+    assert np.isnan(rate).all() and not converged.any()
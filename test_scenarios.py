@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from model import run_model
+from rate_paths import PATH_INPUTS
+from scenarios import evaluate_scenarios, npv_scenarios
+
+YEARS = 12
+
+
+@pytest.mark.parametrize("table", [
+    {"loan_term": [0, 5, 10], "loan_pct": [0, 50, 100]},
+    # No term means no loan, whatever loan_pct says
+    {"loan_term": 0, "loan_pct": [50, 100]},
+    # Fractional terms round to whole years in every engine
+    {"loan_term": [2.5, 3.5, 4.4], "loan_pct": 100, "interest_rate": 25.0},
+    {"grace_years": [1, 2], "loan_term": 6},
+    {"balloon_pct": [20.0, 50.0], "loan_term": [4, 7]},
+    {"refinance_year": [2, 3], "refinance_rate": [6.0, np.nan], "refinance_term": [np.nan, 8]},
+    {"lease": [0, 1], "lease_term": [np.nan, 6], "lease_buyout_pct": [0.0, 10.0]},
+    {"energy_cost_per_kwh": [np.nan, 120.0], "sessions_per_day": [10, 200]},
+])
+def test_npv_scenarios_matches_evaluate_scenarios(table):
+    np.testing.assert_allclose(npv_scenarios(table, YEARS), evaluate_scenarios(table, YEARS).npv, rtol=1e-10)
+
+
+@pytest.mark.parametrize("periods_per_year", [1, 12])
+def test_constant_rate_paths_reproduce_constant_rates(periods_per_year):
+    table = {"revenue_growth": [3.0, 12.0], "opex_inflation": [5.0, 15.0], "interest_rate": [10.0, 22.0],
+             "grace_years": [0, 1], "refinance_year": [0, 4]}
+    expected = evaluate_scenarios(table, YEARS, periods_per_year)
+    paths = {name: np.repeat(np.asarray(table[name])[:, np.newaxis], YEARS, axis=-1) for name in PATH_INPUTS}
+    results = evaluate_scenarios(table, YEARS, periods_per_year, rate_paths=paths)
+    for name in ("cash_flows", "npv", "after_tax_npv"):
+        np.testing.assert_allclose(getattr(results, name), getattr(expected, name), rtol=1e-10)
+
+
+def test_run_model_with_constant_rate_paths():
+    args = (50, 20, 300, 15_000_000, 500_000, 5.0, 3.0, 50, 5, 10.0, False, YEARS, 10.0)
+    rates = {"revenue_growth": 3.0, "opex_inflation": 5.0, "interest_rate": 10.0}
+    expected = run_model(*args, periods_per_year=12)
+    results = run_model(*args, periods_per_year=12, rate_paths={name: (rate,) * YEARS for name, rate in rates.items()})
+    np.testing.assert_allclose(results.npv, expected.npv, rtol=1e-10)
+    np.testing.assert_allclose(results.after_tax_npv, expected.after_tax_npv, rtol=1e-10)
@@ -0,0 +1,24 @@
+import numpy as np
+
+from tax import CIT_BANDS, TERTIARY_EDUCATION_TAX, cit_rate, company_tax
+
+
+def reference_tax(revenue, taxable):
+    # Year-by-year loss pool, used up before any profit is assessed
+    tax, losses = [], 0.0
+    for turnover, profit in zip(revenue, taxable):
+        relief = min(losses, max(profit, 0.0))
+        losses += max(-profit, 0.0) - relief
+        assessable = max(profit, 0.0) - relief
+        rate = cit_rate(turnover) + (TERTIARY_EDUCATION_TAX if turnover > CIT_BANDS[0][0] else 0.0)
+        tax.append(assessable * rate / 100)
+    return tax
+
+
+def test_losses_carry_forward_as_a_loop_would():
+    rng = np.random.default_rng(0)
+    revenue = rng.uniform(10e6, 200e6, (500, 15))
+    costs = revenue * rng.uniform(0.5, 1.5, (500, 15))
+    result = company_tax(revenue, costs, 0.0, 0.0)
+    expected = [reference_tax(row, profit) for row, profit in zip(revenue, revenue - costs)]
+    np.testing.assert_allclose(result.tax, expected, rtol=1e-9, atol=1e-6)
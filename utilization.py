@@ -0,0 +1,140 @@
+import numpy as np
+from typing import NamedTuple
+
+HOURS_PER_YEAR = 8760
+
+# Share of daily charging demand arriving in each hour of the day (Lagos commuter
+# pattern: morning peak 7-10am, evening peak 5-8pm, little overnight demand)
+LAGOS_HOURLY_PROFILE = np.array([
+    0.5, 0.3, 0.2, 0.2, 0.3, 0.8, 2.0, 4.5, 6.5, 6.0, 5.0, 4.5,
+    4.5, 4.5, 4.5, 5.0, 6.0, 7.5, 8.0, 7.0, 5.5, 4.0, 2.5, 1.2,
+])
+LAGOS_HOURLY_PROFILE = LAGOS_HOURLY_PROFILE / LAGOS_HOURLY_PROFILE.sum()
+
+
+class UtilizationResult(NamedTuple):
+    demand: np.ndarray
+    served: np.ndarray
+    lost: np.ndarray
+    utilization: np.ndarray
+    hourly_served: np.ndarray
+
+    @property
+    def capture_rate(self):
+        """Share of demanded sessions actually served, per year."""
+        with np.errstate(invalid="ignore"):
+            return np.where(self.demand > 0, self.served / self.demand, 1.0)
+
+
+def demand_index(demand_growth, years):
+    """Demand in years 1..years relative to year 1, shape (..., years, 1).
+
+    `demand_growth` is a constant rate (percent) or a (N, years) path of
+    year-by-year rates, compounded as in projection.project so that demand
+    keeps in step with revenue from year 1 on.
+    """
+    rate = np.asarray(demand_growth, dtype=float)
+    if rate.ndim >= 2:
+        growth = np.cumprod(1 + rate[..., :years] / 100, axis=-1)
+        return (growth / growth[..., :1])[..., np.newaxis]
+    year = np.arange(1, years + 1)[:, np.newaxis]
+    return (1 + rate[..., np.newaxis, np.newaxis] / 100) ** (year - 1)
+
+
+def simulate_utilization(sessions_per_day, charging_time, chargers, years=1, demand_growth=0.0,
+                         profile=LAGOS_HOURLY_PROFILE, seed=None):
+    """Simulate arrivals and charger occupancy for every hour of every year.
+
+    Arrivals in each hour are Poisson with mean sessions_per_day * profile[hour],
+    growing by `demand_growth` percent a year (a constant or a (N, years)
+    path, see demand_index), at uniformly random minutes
+    within the hour. Each charger holds one session for `charging_time`
+    minutes, including into later hours; a driver who arrives while every
+    charger is busy leaves without charging (there is no queue) and is
+    counted as lost. Inputs broadcast, so arrays of charger counts (or of
+    demand levels) are simulated together; the chargers' release times are
+    tracked for all scenarios and days at once, stepping through each day's
+    arrivals in time order. `profile` may also carry leading axes, one 24-hour profile per
+    scenario. Per-year totals have shape (..., years); `hourly_served`, the
+    sessions started in each hour, has shape (..., years, 8760).
+    """
+    sessions_per_day = np.asarray(sessions_per_day, dtype=float)[..., np.newaxis, np.newaxis]
+    charging_time = np.asarray(charging_time, dtype=float)[..., np.newaxis, np.newaxis]
+    chargers = np.asarray(chargers, dtype=float)[..., np.newaxis, np.newaxis]
+
+    hour_of_day = np.arange(HOURS_PER_YEAR) % 24
+    arrival_rate = sessions_per_day * demand_index(demand_growth, years) * np.asarray(profile, dtype=float)[..., np.newaxis, hour_of_day]
+
+    rng = np.random.default_rng(seed)
+    shape = np.broadcast_shapes(arrival_rate.shape, chargers.shape, charging_time.shape)
+    arrivals = rng.poisson(np.broadcast_to(arrival_rate, shape))
+
+    # One row per simulated day, holding its arrival minutes in time order from `first`
+    daily = arrivals.reshape(-1, 24)
+    rows = len(daily)
+    hour = np.repeat(np.arange(daily.size), daily.ravel())
+    minutes = 60 * (np.sort(hour + rng.random(len(hour))) - 24 * (hour // 24))
+    arriving = daily.sum(axis=-1)
+    first = np.cumsum(arriving) - arriving
+
+    # Minute of the day at which each charger next becomes free (never, for chargers a
+    # scenario lacks). Sessions start in time order and all last charging_time, so chargers
+    # free up in the order they were taken and the next one to free up is the next in rotation.
+    days = HOURS_PER_YEAR // 24
+    installed = np.repeat(np.broadcast_to(chargers[..., 0], shape[:-1]).ravel(), days)
+    count = np.maximum(installed, 1).astype(int)
+    duration = np.repeat(np.broadcast_to(charging_time[..., 0], shape[:-1]).ravel(), days)
+    idle = np.where(np.arange(int(np.max(count))) < installed[:, np.newaxis], 0.0, np.inf)
+
+    # Days run side by side, each from the chargers' state at the end of the day before.
+    # The first pass starts every day idle; later passes rerun only the days whose starting
+    # state has changed, until every day starts where the previous one ended.
+    taken = np.zeros(len(minutes), dtype=bool)
+    start = idle.copy()
+    end = np.empty_like(idle)
+    todo = np.arange(rows)
+    while len(todo):
+        end[todo] = _serve_days(minutes, first[todo], arriving[todo], start[todo], count[todo], duration[todo], taken)
+        carried = np.where((np.arange(rows) % days == 0)[:, np.newaxis], idle, np.roll(end, 1, axis=0))
+        todo = np.flatnonzero((carried != start).any(axis=-1))
+        start = carried
+    served = np.bincount(hour, weights=taken, minlength=daily.size).astype(int).reshape(shape)
+
+    demand = arrivals.sum(axis=-1)
+    served_total = served.sum(axis=-1)
+    busy_minutes = served_total * charging_time[..., 0]
+    utilization = busy_minutes / (chargers[..., 0] * 60 * HOURS_PER_YEAR)
+
+    return UtilizationResult(demand, served_total, demand - served_total, utilization, served)
+
+
+def _serve_days(minutes, first, arriving, free_at, count, duration, taken):
+    """Serve each day's arrivals in time order, marking them in `taken`; returns free_at at midnight.
+
+    Rows are days; `minutes[first + k]` is the minute of a day's k-th arrival.
+    The returned release times are rotated so the next charger to be taken
+    comes first, and counted from the next midnight (0 for chargers already free).
+    """
+    order = np.argsort(-arriving, kind="stable")
+    first, arriving, count, duration = first[order], arriving[order], count[order], duration[order]
+    free_at = free_at[order]
+    turn = np.zeros(len(order), dtype=int)
+    # Days sorted by their number of arrivals, so those with a k-th arrival come first
+    active = np.searchsorted(-arriving, -np.arange(arriving.max(initial=0)), side="left")
+    for k, n in enumerate(active):
+        row = np.arange(n)
+        position = first[:n] + k
+        start = minutes[position]
+        charger = turn[:n] % count[:n]
+        released = free_at[row, charger]
+        takes = released <= start
+        free_at[row, charger] = np.where(takes, start + duration[:n], released)
+        turn[:n] += takes
+        taken[position] = takes
+
+    chargers = np.arange(free_at.shape[-1])
+    rotation = np.where(chargers < count[:, np.newaxis], (turn[:, np.newaxis] + chargers) % count[:, np.newaxis], chargers)
+    midnight = np.maximum(np.take_along_axis(free_at, rotation, axis=-1) - 24 * 60, 0.0)
+    end = np.empty_like(midnight)
+    end[order] = midnight
+    return end